@@ -0,0 +1,10 @@
+"""Benchmarks of pynetcf on a synthetic inventory in the fake NSoT server
+
+Run the benchmarks and save the results as JSON:
+
+    python -m benchmarks run --scale small --output results.json
+
+Compare two runs for regressions:
+
+    python -m benchmarks compare baseline.json results.json
+"""
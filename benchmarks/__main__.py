@@ -0,0 +1,67 @@
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+from .inventory import SCALES
+from .suite import BENCHMARKS, compare, load, run, save
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--scale", choices=list(SCALES), default="small")
+    run_parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    run_parser.add_argument("--repeat", type=int, default=1)
+    run_parser.add_argument(
+        "--output", help="path of the JSON results, default to benchmarks/results"
+    )
+    run_parser.add_argument(
+        "--log", action="store_true", help="keep the pynetcf info logging enabled"
+    )
+
+    compare_parser = commands.add_parser("compare", help="compare two results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        rows = compare(load(args.baseline), load(args.results), args.threshold)
+        for name, step, old, new, ratio, status in rows:
+            print(f"{name:20} {step:32} {old:10.4f} {new:10.4f} {ratio:7.2f}x {status}")
+        return 1 if any(row[-1] == "regression" for row in rows) else 0
+
+    # the info logging of every object dominates the timings
+    if not args.log:
+        logging.disable(logging.INFO)
+
+    results = run(args.scale, args.only, args.repeat)
+    results["meta"]["logging"] = args.log
+
+    for name, result in results["results"].items():
+        if result.get("skipped") or result.get("error"):
+            print(f"{name:20} {result.get('skipped') or result['error']}")
+        for step, values in result["steps"].items():
+            print(f"{name:20} {step:32} {values['seconds']:10.4f}s {values['ops']:>8}")
+        for key, values in result.get("memory", {}).items():
+            per_object = values["bytes_per_object"] or 0
+            print(f"{name:20} {key:32} {per_object:10.1f}B {values['objects']:>8}")
+
+    output = args.output
+    if output is None:
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join("benchmarks", "results", f"{args.scale}-{timestamp}.json")
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    save(results, output)
+    print(f"results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import ipaddress
+from collections import namedtuple
+
+Scale = namedtuple(
+    "Scale",
+    [
+        "sites",
+        "devices",
+        "interfaces",
+        "addresses",
+        "hosts_per_subnet",
+        "queries",
+        "allocations",
+        "commit_devices",
+    ],
+)
+
+# the size of the synthetic inventory, the devices are spread across the
+# sites, `interfaces` is per device and `addresses` is per interface
+SCALES = {
+    "tiny": Scale(1, 20, 4, 2, 50, 20, 20, 2),
+    "small": Scale(2, 200, 10, 2, 100, 50, 50, 10),
+    "medium": Scale(4, 2000, 25, 4, 100, 50, 100, 50),
+    "large": Scale(10, 10000, 50, 4, 100, 50, 100, 100),
+}
+
+# the root network of every site, the sites are separate namespaces in NSoT
+ROOT_CIDR = "10.0.0.0/8"
+
+# the prefix length of the aggregate networks and the host subnets
+AGGREGATE_PREFIXLEN = 16
+SUBNET_PREFIXLEN = 24
+
+
+def get_scale(name):
+    "Return the `Scale` of the preset name"
+    try:
+        return SCALES[name]
+    except KeyError:
+        raise ValueError(f"Invalid scale '{name}', choices are {list(SCALES)}")
+
+
+def _nth_cidr(index, prefixlen):
+    root = ipaddress.ip_network(ROOT_CIDR)
+    return f"{root.network_address + index * 2 ** (32 - prefixlen)}/{prefixlen}"
+
+
+def subnet_cidr(index):
+    "Return the CIDR of the nth host subnet of a site"
+    return _nth_cidr(index, SUBNET_PREFIXLEN)
+
+
+def aggregate_cidr(index):
+    "Return the CIDR of the nth aggregate network of a site"
+    return _nth_cidr(index, AGGREGATE_PREFIXLEN)
+
+
+def site_devices(scale, site_id):
+    "Return the number of devices of the site"
+    per_site, remainder = divmod(scale.devices, scale.sites)
+    return per_site + (1 if site_id <= remainder else 0)
+
+
+def site_subnets(scale, site_id):
+    "Return the number of host subnets of the site"
+    addresses = site_devices(scale, site_id) * scale.interfaces * scale.addresses
+    return -(-addresses // scale.hosts_per_subnet)
+
+
+def site_names(scale):
+    "Return the names of the sites, the site ID is the position from 1"
+    return [f"site{i}" for i in range(1, scale.sites + 1)]
+
+
+def iter_attributes(scale):
+    for site_id in range(1, scale.sites + 1):
+        yield {"site_id": site_id, "resource_name": "Network", "name": "assignment"}
+        yield {"site_id": site_id, "resource_name": "Device", "name": "role"}
+
+
+def iter_devices(scale):
+    for site_id in range(1, scale.sites + 1):
+        for n in range(site_devices(scale, site_id)):
+            yield {
+                "site_id": site_id,
+                "hostname": f"leaf{n:05d}",
+                "attributes": {"role": "spine" if n % 20 == 0 else "leaf"},
+            }
+
+
+def iter_networks(scale):
+    "Yield the root, aggregate and host subnets of every site, parents first"
+    for site_id in range(1, scale.sites + 1):
+        yield {"site_id": site_id, "cidr": ROOT_CIDR}
+
+        subnets = site_subnets(scale, site_id)
+        per_aggregate = 2 ** (SUBNET_PREFIXLEN - AGGREGATE_PREFIXLEN)
+
+        for index in range(-(-subnets // per_aggregate)):
+            yield {"site_id": site_id, "cidr": aggregate_cidr(index)}
+
+        for index in range(subnets):
+            yield {
+                "site_id": site_id,
+                "cidr": subnet_cidr(index),
+                "state": "reserved",
+                "attributes": {"assignment": f"vlan{index % 4000 + 1}"},
+            }
+
+
+def iter_interfaces(scale):
+    """Yield the interfaces of every device, the addresses are assigned from
+    the host subnets in order and created by NSoT on assignment"""
+    for site_id in range(1, scale.sites + 1):
+        host = 0
+        for n in range(site_devices(scale, site_id)):
+            for k in range(scale.interfaces):
+                addresses = []
+                for _ in range(scale.addresses):
+                    subnet, num = divmod(host, scale.hosts_per_subnet)
+                    network = ipaddress.ip_network(subnet_cidr(subnet))
+                    addresses.append(f"{network.network_address + num + 1}/32")
+                    host += 1
+
+                yield {
+                    "site_id": site_id,
+                    "device": f"leaf{n:05d}",
+                    "name": f"swp{k + 1}",
+                    "addresses": addresses,
+                }
+
+
+def generate(scale):
+    """
+    Return the synthetic inventory of the scale for `FakeNSoT.load`, the
+    objects are generated on demand. The sites is created beforehand with
+    `site_names`
+    :param scale (Scale): the size of the inventory
+    """
+    return {
+        "attributes": iter_attributes(scale),
+        "devices": iter_devices(scale),
+        "networks": iter_networks(scale),
+        "interfaces": iter_interfaces(scale),
+    }
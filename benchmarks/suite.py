@@ -0,0 +1,440 @@
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import pynetcf.constants as C
+from pynetcf.nsot import fake
+from .inventory import (
+    aggregate_cidr,
+    generate,
+    get_scale,
+    site_devices,
+    site_names,
+    site_subnets,
+    subnet_cidr,
+)
+
+# the registered benchmarks key by name, in the order of registration
+BENCHMARKS = {}
+
+# the allocation order of the hosts and subnets generators
+ALLOCATION_MODES = (
+    ("sequential", {}),
+    ("random", {"random": True}),
+    ("reverse", {"reverse": True}),
+)
+
+
+def benchmark(func):
+    """Register a benchmark, the function is called with the `Scale` and the
+    `Timer` in a forked process of the seeded fake NSoT server and may return
+    a dict of extra results"""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+class Timer:
+    "Holds the timings of the steps of a benchmark"
+
+    def __init__(self):
+        self.steps = {}
+
+    @contextmanager
+    def step(self, name):
+        """
+        Time the step within the context, the yield dict is the step result
+        and its `ops` is the number of operations of the step
+        :param name (str): name of the step
+        """
+        step = {"ops": 1}
+        start = time.perf_counter()
+        yield step
+        seconds = time.perf_counter() - start
+        step.update(
+            {
+                "seconds": seconds,
+                "ops_per_second": step["ops"] / seconds if seconds else None,
+            }
+        )
+        self.steps[name] = step
+
+
+@benchmark
+def cold_load(scale, timer):
+    "Load the NSoT objects of every resource model from the fake NSoT server"
+    from pynetcf.nsot.interface import Device, Interface
+    from pynetcf.nsot.network import Network
+
+    for model in (Device, Network, Interface):
+        with timer.step(f"load_{model._resource_name}") as step:
+            model.manager.load()
+            step["ops"] = len(model.manager._objects)
+
+
+@benchmark
+def edit_interfaces(scale, timer):
+    """Edit a few interfaces of the loaded site, only the interfaces and their
+    related objects are created from the raw NSoT objects"""
+    from pynetcf.nsot.interface import Interface
+    from pynetcf.nsot.planner import CommitPlanner
+
+    with timer.step("load_interfaces") as step:
+        Interface.manager.load()
+        step["ops"] = len(Interface.manager._objects)
+
+    rng = random.Random(0)
+    hostnames = [f"leaf{n:05d}" for n in range(site_devices(scale, 1))]
+    keys = [
+        (rng.choice(hostnames), f"swp{rng.randrange(scale.interfaces) + 1}", 1)
+        for _ in range(10)
+    ]
+
+    with timer.step("edit") as step:
+        for key in keys:
+            Interface(*key).description = "edited"
+        step["ops"] = len(keys)
+
+    with timer.step("pending") as step:
+        step["results"] = len(CommitPlanner().pending())
+
+
+@benchmark
+def hosts_generator(scale, timer):
+    "Allocate host addresses from the existing host subnets"
+    from pynetcf.nsot.network import Network
+
+    Network.manager.load()
+
+    for index, (mode, kwargs) in enumerate(ALLOCATION_MODES):
+        network = Network(subnet_cidr(index), 1)
+        with timer.step(f"hosts_{mode}") as step:
+            hosts = network.hosts_generator(**kwargs)
+            for _ in range(scale.allocations):
+                next(hosts)
+            step["ops"] = scale.allocations
+
+
+@benchmark
+def subnets_generator(scale, timer):
+    "Allocate subnets from the aggregate network of the existing host subnets"
+    from pynetcf.nsot.network import Network
+
+    Network.manager.load()
+    aggregate = Network(aggregate_cidr(0), 1)
+
+    for mode, kwargs in ALLOCATION_MODES:
+        with timer.step(f"subnets_{mode}") as step:
+            subnets = aggregate.subnets_generator(26, **kwargs)
+            for _ in range(scale.allocations):
+                next(subnets)
+            step["ops"] = scale.allocations
+
+
+@benchmark
+def query(scale, timer):
+    "Look up and filter the loaded objects through the resource managers"
+    from pynetcf.nsot.interface import Device, Interface
+    from pynetcf.nsot.network import Network
+
+    Interface.manager.load()
+
+    rng = random.Random(0)
+    subnets = site_subnets(scale, 1)
+    cidrs = [subnet_cidr(rng.randrange(subnets)) for _ in range(scale.queries)]
+    devices = rng.sample(list(Device.manager._objects.values()), scale.queries)
+
+    with timer.step("network_get_cidr") as step:
+        for cidr in cidrs:
+            Network.manager.get(cidr=cidr, site_id=1)
+        step["ops"] = scale.queries
+
+    with timer.step("device_get_hostname") as step:
+        for device in devices:
+            Device.manager.get(hostname=device.hostname, site_id=device.site_id)
+        step["ops"] = scale.queries
+
+    with timer.step("interface_get_device_name") as step:
+        for device in devices:
+            Interface.manager.get(device=device, name="swp1")
+        step["ops"] = scale.queries
+
+    with timer.step("network_filter_prefix_length") as step:
+        step["results"] = len(list(Network.manager.filter(prefix_length=24)))
+
+    with timer.step("network_filter_assignment") as step:
+        step["results"] = len(list(Network.manager.filter(assignment="vlan1")))
+
+    with timer.step("network_filter_attribute") as step:
+        networks = Network.manager.filter(attributes__assignment="vlan1")
+        step["results"] = len(list(networks))
+
+    with timer.step("device_filter_attribute_prefix") as step:
+        devices = Device.manager.filter(attributes__role__startswith="sp")
+        step["results"] = len(list(devices))
+
+
+@benchmark
+def assign_networks(scale, timer):
+    "Assign networks to the L2 VLANs of a site with `VlanManager`"
+    try:
+        from pynetcf.config_models.vlan.manager import VlanManager
+    except ImportError as e:
+        return {"skipped": f"VlanManager is not importable: {e}"}
+
+    manager = VlanManager(site_name=site_names(scale)[0])
+    for vid in range(1, scale.allocations + 1):
+        manager.add(id=vid, name=f"vlan{vid}")
+
+    with timer.step("assign_networks") as step:
+        manager.assign_networks()
+        step["ops"] = scale.allocations
+
+
+@benchmark
+def bulk_commit(scale, timer):
+    "Commit new devices, interfaces, subnets and addresses in bulk"
+    from pynetcf.nsot.interface import Interface
+    from pynetcf.nsot.network import Network
+    from pynetcf.nsot.planner import CommitPlanner
+
+    Interface.manager.load()
+
+    base = site_subnets(scale, 1)
+    for n in range(scale.commit_devices):
+        network = Network(subnet_cidr(base + n), 1)
+        hosts = network.hosts_generator()
+        for k in range(scale.interfaces):
+            interface = Interface(f"bench{n:05d}", f"swp{k + 1}", 1)
+            interface.add_addresses(next(hosts).cidr)
+
+    planner = CommitPlanner()
+    pending = len(planner.pending())
+    requests = fake.server.requests.copy()
+
+    with timer.step("commit") as step:
+        step["waves"] = planner.commit()
+        step["ops"] = pending
+
+    return {
+        "requests": {
+            f"{method} {name}": count
+            for (method, name), count in (fake.server.requests - requests).items()
+        }
+    }
+
+
+@benchmark
+def memory(scale, timer):
+    """Measure the memory per object of the resource models, the NSoT objects
+    are fetched beforehand so only the objects of the models are measured"""
+    from pynetcf.nsot.client import NSoTClient
+    from pynetcf.nsot.interface import Device, Interface
+    from pynetcf.nsot.network import Network
+
+    for model in (Device, Network, Interface):
+        NSoTClient.get_resource(model._resource_name)
+
+    def measure(func):
+        "Return the number of objects created by func and the memory allocated"
+        tracemalloc.start()
+        try:
+            count = func()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return {
+            "objects": count,
+            "bytes": size,
+            "bytes_per_object": size / count if count else None,
+        }
+
+    def load(model):
+        model.manager.load()
+        return len(model.manager._objects.values())
+
+    result = {}
+    for model in (Device, Network, Interface):
+        result[model._resource_name] = measure(lambda: load(model))
+
+    # new host addresses allocated from the host subnets
+    def allocate():
+        count = 0
+        for index in range(3):
+            hosts = Network(subnet_cidr(index), 1).hosts_generator()
+            for _ in range(scale.allocations):
+                next(hosts)
+                count += 1
+        return count
+
+    result["new_hosts"] = measure(allocate)
+
+    return {"memory": result}
+
+
+def _run_child(func, scale, conn):
+    "Run the benchmark in the forked process and send back the result"
+    timer = Timer()
+    try:
+        result = {"steps": timer.steps, **(func(scale, timer) or {})}
+    except Exception:
+        result = {"steps": timer.steps, "error": traceback.format_exc()}
+    conn.send(result)
+    conn.close()
+
+
+def run_benchmark(name, scale):
+    """
+    Run a single benchmark in a forked process, so every run starts with cold
+    caches of the resource models and shares the seeded fake NSoT server
+    :param name (str): name of the benchmark
+    :param scale (Scale): the size of the inventory
+    """
+    context = get_context("fork")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_child, args=(BENCHMARKS[name], scale, child_conn)
+    )
+    process.start()
+    child_conn.close()
+
+    try:
+        result = parent_conn.recv()
+    except EOFError:
+        result = {"steps": {}, "error": "benchmark process exited unexpectedly"}
+    process.join()
+    return result
+
+
+def _summarize(runs):
+    "Merge the runs of a benchmark, the step seconds is the best of the runs"
+    result = dict(runs[0])
+    steps = {}
+    for name, step in result["steps"].items():
+        samples = [r["steps"][name]["seconds"] for r in runs if name in r["steps"]]
+        best = min(samples)
+        steps[name] = {
+            **step,
+            "seconds": best,
+            "ops_per_second": step["ops"] / best if best else None,
+            "samples": samples,
+        }
+    result["steps"] = steps
+
+    errors = [run["error"] for run in runs if run.get("error")]
+    if errors:
+        result["error"] = errors[0]
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale_name, names=None, repeat=1):
+    """
+    Seed the fake NSoT server with the synthetic inventory and run the
+    benchmarks
+    :param scale_name (str): the preset of the inventory size in `SCALES`
+    :param names (list): the benchmarks to run, default to all
+    :param repeat (int): number of runs per benchmark, the best is reported
+    :return: dict of the run metadata and the results per benchmark
+    """
+    scale = get_scale(scale_name)
+    names = names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Invalid benchmark '{name}', choices {list(BENCHMARKS)}")
+
+    C.NSOT_FAKE = True
+
+    start = time.perf_counter()
+    fake.server.reset(site_names(scale))
+    fake.server.load(generate(scale))
+    seed_seconds = time.perf_counter() - start
+
+    results = {}
+    for name in names:
+        runs = [run_benchmark(name, scale) for _ in range(repeat)]
+        results[name] = _summarize(runs)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale_name,
+            "inventory": scale._asdict(),
+            "objects": {
+                name: len(objects) for name, objects in fake.server._objects.items()
+            },
+            "seed_seconds": seed_seconds,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.1):
+    """
+    Compare the step timings and the memory per object of two runs
+    :param old (dict): the baseline results of `run`
+    :param new (dict): the results to compare
+    :param threshold (float): the ratio of more seconds or bytes per object
+        that is a regression
+    :return: list of tuple of benchmark, step, old and new value, ratio and
+        status `regression`, `improvement` or `ok`
+    """
+    rows = []
+    for name, result in new["results"].items():
+        old_result = old["results"].get(name, {})
+
+        # the seconds of the steps and the bytes per object of the memory
+        values = [
+            (step, old_result["steps"][step]["seconds"], v["seconds"])
+            for step, v in result.get("steps", {}).items()
+            if step in old_result.get("steps", {})
+        ]
+        old_memory = old_result.get("memory", {})
+        values.extend(
+            (f"memory_{k}", old_memory[k]["bytes_per_object"], v["bytes_per_object"])
+            for k, v in result.get("memory", {}).items()
+            if k in old_memory
+        )
+
+        for step, old_value, new_value in values:
+            if old_value is None or new_value is None:
+                continue
+            ratio = new_value / old_value if old_value else float("inf")
+
+            if ratio > 1 + threshold:
+                status = "regression"
+            elif ratio < 1 - threshold:
+                status = "improvement"
+            else:
+                status = "ok"
+
+            rows.append((name, step, old_value, new_value, ratio, status))
+    return rows
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
@@ -1,6 +1,6 @@
 from collections import defaultdict
 
-from pynetcf.utils import get_logger
+from pynetcf.utils import get_logger, filter_objects
 from pynetcf.nsot.network.manager import NSoTNetworks
 from pynetcf.utils.macaddr import MACAddressManager
 from .vlan import Vlan
@@ -86,25 +86,9 @@ class VlanManager:
         return self._cache.get(vid)
 
     def filter(self, **kwargs):
-
-        if kwargs:
-            for vlan in self._cache.values():
-                query = []
-                try:
-                    for key, value in kwargs.items():
-                        try:
-                            attr_value = value(getattr(vlan, key))
-                        except TypeError:
-                            attr_value = getattr(vlan, key)
-                        query.append(
-                            True
-                            if value == attr_value or attr_value is True
-                            else False
-                        )
-                    if all(query):
-                        yield vlan
-                except AttributeError:
-                    pass
+        """Yield the `Vlan` based on kwargs, see `Query` for the lookups
+        ex. `filter(tenant="default", id__lt=4000)`"""
+        yield from filter_objects(self._cache.values(), **kwargs)
 
     def assign_networks(self, random=False):
         """Assign network to `Vlan` and MAC address
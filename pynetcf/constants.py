@@ -3,6 +3,63 @@ import os
 # the path where the database of configuration
 DATABASE_DIR = "/home/%s/.pynetcf" % os.environ.get("USER")
 
+# load the NSoT resource objects from the on-disk snapshot in DATABASE_DIR and
+# revalidate the snapshot in background instead of fetching on every start
+NSOT_SNAPSHOT = False
+
+# number of NSoT resource objects to fetch per request when loading
+NSOT_PAGE_SIZE = 1000
+
+# number of NSoT resource objects to POST or PATCH per bulk request
+NSOT_BULK_CHUNK_SIZE = 500
+
+# number of worker threads to commit a wave of NSoT resource objects
+NSOT_COMMIT_WORKERS = 8
+
+# maximum concurrent NSoT requests per site of the asyncio client and the
+# number of threads running the requests
+NSOT_ASYNC_CONCURRENCY = 16
+NSOT_ASYNC_WORKERS = 64
+
+# retries of a failed idempotent NSoT request with exponential backoff in
+# seconds, capped to the maximum backoff
+NSOT_RETRIES = 3
+NSOT_RETRY_BACKOFF = 0.5
+NSOT_RETRY_BACKOFF_MAX = 30
+
+# consecutive NSoT server failures to open the circuit breaker and the seconds
+# before a trial request is allowed
+NSOT_CIRCUIT_THRESHOLD = 5
+NSOT_CIRCUIT_RESET_TIMEOUT = 30
+
+# token bucket rate limit of NSoT requests per site and HTTP method, a pair of
+# requests per second and burst size, `None` is not limited
+NSOT_RATE_LIMITS = {
+    "GET": None,
+    "POST": None,
+    "PUT": None,
+    "PATCH": None,
+    "DELETE": None,
+}
+
+# adjust the concurrent NSoT requests per site based on latency and server
+# errors (AIMD), the initial and maximum limit and the target latency in seconds
+NSOT_ADAPTIVE_CONCURRENCY = False
+NSOT_ADAPTIVE_INITIAL = 8
+NSOT_ADAPTIVE_MAXIMUM = 64
+NSOT_ADAPTIVE_LATENCY = 1.0
+
+# number of NSoT changes to fetch per request when syncing the cache objects
+NSOT_CHANGES_PAGE_SIZE = 100
+
+# use the bundled in-memory fake NSoT server `pynetcf.nsot.fake` instead of the
+# NSoT server in pynsotrc, to benchmark and test without network
+NSOT_FAKE = bool(os.environ.get("PYNETCF_NSOT_FAKE"))
+
+# maximum number of addresses of a network to allocate hosts with a bitmap of a
+# byte per address, the larger networks keep only the used addresses
+HOSTS_BITMAP_MAX_SIZE = 2**16
+
 # L3 VLANID reserve range
 RESERVED_L3_VLANID = range(4000, 4091)
 
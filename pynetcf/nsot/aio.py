@@ -0,0 +1,120 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pynetcf.constants as C
+from pynetcf.utils.logger import get_logger
+from .metrics import metrics
+from .planner import CommitPlanner
+
+logger = get_logger(__name__)
+
+
+class AsyncNSoTClient:
+    """Asyncio variant of the NSoT resource operations
+
+    The NSoT API client is blocking, each operation is run in a thread pool
+    and awaited so many requests can be in flight from a single process. The
+    number of concurrent requests is limited per site.
+    """
+
+    def __init__(self, concurrency=None, max_workers=None):
+        """
+        :param concurrency (int): maximum concurrent requests per site,
+            default to `NSOT_ASYNC_CONCURRENCY`
+        :param max_workers (int): number of threads running the requests,
+            default to `NSOT_ASYNC_WORKERS`
+        """
+        self._concurrency = concurrency or C.NSOT_ASYNC_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or C.NSOT_ASYNC_WORKERS
+        )
+        self._semaphores = {}
+
+    def _semaphore(self, site_id):
+        "Return the semaphore of the site, created in the running event loop"
+        if self._semaphores.get(site_id) is None:
+            self._semaphores[site_id] = asyncio.Semaphore(self._concurrency)
+        return self._semaphores[site_id]
+
+    async def run(self, site_id, func, *args, **kwargs):
+        """
+        Run a blocking function in the thread pool within the concurrency
+        limit of the site
+        :param site_id (int): the site of the request, `None` is not limited
+            with other sites
+        :param func: the blocking function
+        """
+        loop = asyncio.get_running_loop()
+        # the phase is per thread, run the function in the phase of the caller
+        func = metrics.in_phase(partial(func, *args, **kwargs))
+        async with self._semaphore(site_id):
+            return await loop.run_in_executor(self._executor, func)
+
+    async def load(self, *models):
+        """
+        Load the existing NSoT resource objects of the models concurrently
+        :param models: the `Resource` classes
+        :return: list of the objects of each model
+        """
+        return await asyncio.gather(
+            *[self.run(None, model.manager.get) for model in models]
+        )
+
+    async def update_post(self, obj):
+        "POST or PATCH resource in NSoT server"
+        return await self.run(obj.site_id, obj.update_post)
+
+    async def delete(self, obj, **kwargs):
+        "DELETE resource in NSoT server"
+        return await self.run(obj.site_id, obj.delete, **kwargs)
+
+    async def update_post_many(self, objects):
+        """POST or PATCH the objects concurrently, the objects must not share
+        dependencies that does not exists yet, use `commit` instead"""
+        return await asyncio.gather(*[self.update_post(obj) for obj in objects])
+
+    async def delete_many(self, objects, **kwargs):
+        "DELETE the objects concurrently"
+        return await asyncio.gather(*[self.delete(obj, **kwargs) for obj in objects])
+
+    async def commit(self, objects=None):
+        """
+        Commit the pending objects in dependency order, the objects of a wave
+        are POST or PATCH concurrently
+        :param objects (list): the objects to commit, default to all the
+            pending objects of the loaded resource models
+        :return: number of waves commited
+        """
+        planner = CommitPlanner(objects)
+        count = 0
+
+        while True:
+            waves = await self.run(None, planner.plan)
+            if not waves:
+                break
+
+            pending = sum(len(wave) for wave in waves)
+            for wave in waves:
+                logger.info(f"async commit wave {count} of {len(wave)} objects")
+                # the phase of the event loop thread is shared by all the tasks
+                await asyncio.gather(
+                    *[
+                        self.run(
+                            obj.site_id, metrics.in_phase(obj.update_post, "commit")
+                        )
+                        for obj in wave
+                    ]
+                )
+                count += 1
+
+            # stop if the commit has no progress
+            if len(planner.pending()) >= pending:
+                logger.warning(f"{pending} objects still have changes")
+                break
+
+        return count
+
+    def close(self):
+        "Shutdown the thread pool"
+        self._executor.shutdown(wait=True)
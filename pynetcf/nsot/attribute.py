@@ -1,5 +1,7 @@
 from pynetcf.utils.logger import get_logger
 from .client import NSoTClient, nsot_request
+from .endpoint import Endpoint
+from .resource import Resource
 
 
 CONSTRAINTS = ["pattern", "valid_values", "allow_empty"]
@@ -53,7 +55,11 @@ class Attribute:
                 "Reqiure 'resource_name' and 'name' via param or nsot_object"
             )
 
-        self._resource = getattr(NSoTClient.resource.sites(site_id), RESOURCE_NAME)
+        self._resource = Endpoint(
+            getattr(NSoTClient.resource.sites(site_id), RESOURCE_NAME),
+            site_id,
+            RESOURCE_NAME,
+        )
         self._values = set()
 
         self._payload = payload
@@ -66,8 +72,16 @@ class Attribute:
 
     @property
     def values(self):
-        """The resources that the attribute assigned"""
-        return list(self._values)
+        """The resources that the attribute assigned, look up in the attribute
+        index of the resource model"""
+        values = set(self._values)
+
+        model = Resource._models.get(self.resource_name.lower() + "s")
+        if model is not None:
+            store = model.manager._objects
+            keys = store.attribute_keys(self.name, site_ids=(self.site_id,))
+            values.update(obj for obj in map(store.hydrate, keys) if obj is not None)
+        return list(values)
 
     # @property
     # def payload(self):
@@ -1,52 +1,280 @@
+import time
+from threading import Thread, local
+
 from pynsot.client import get_api_client
 
+import pynetcf.constants as C
+from pynetcf.utils import LazyAttribute
+from pynetcf.utils.logger import get_logger
+from . import fake
+from .endpoint import Endpoint
+from .retry import (
+    CircuitOpenError,
+    circuit_breaker,
+    get_retry_delay,
+    is_server_failure,
+    stats,
+)
+from .snapshot import Snapshot
+
+logger = get_logger(__name__)
+
+
+_local = local()
+
 
 def nsot_request(request_func):
     """A decorator that print the body and error message from the request response
     for better presentation of error
+
+    The failed request is retried with jittered exponential backoff if it is
+    idempotent or rejected with 429 up to `NSOT_RETRIES` times, and the
+    `circuit_breaker` fails fast while the server is unhealthy. Only the
+    outermost decorated call retries so nested requests are not retried twice.
     """
 
     def wrapper(*args, **kwargs):
-        try:
-            return request_func(*args, **kwargs)
-        except Exception as e:
+        # nested call, let the outermost call handle the error
+        if getattr(_local, "depth", 0):
+            _local.depth += 1
             try:
-                msg = e.response.json()["error"]["message"]
-                body = e.response.request.body
-                print("ERROR:", msg)
-                if body:
-                    print(body)
-            except AttributeError:
-                pass
-            raise
+                return request_func(*args, **kwargs)
+            finally:
+                _local.depth -= 1
+
+        attempt = 0
+        while True:
+            try:
+                circuit_breaker.before_request()
+            except CircuitOpenError:
+                # the request is not sent but it has failed
+                stats["failures"] += 1
+                raise
+            stats["requests"] += 1
+
+            _local.depth = 1
+            try:
+                result = request_func(*args, **kwargs)
+            except Exception as e:
+                if is_server_failure(e):
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()
+
+                delay = get_retry_delay(e, attempt)
+                if delay is not None:
+                    stats["retries"] += 1
+                    attempt += 1
+                    logger.warning(f"{e}, retry {attempt} in {delay:.2f} seconds")
+                    time.sleep(delay)
+                    continue
+
+                stats["failures"] += 1
+                try:
+                    msg = e.response.json()["error"]["message"]
+                    body = e.response.request.body
+                    print("ERROR:", msg)
+                    if body:
+                        print(body)
+                except AttributeError:
+                    pass
+                raise
+            finally:
+                _local.depth = 0
+
+            circuit_breaker.record_success()
+            return result
 
     return wrapper
 
 
+def get_stats():
+    "Return the counters of NSoT requests and the state of the circuit breaker"
+    return {**stats, "circuit_state": circuit_breaker.state}
+
+
+def get_results(response):
+    "Return the objects of the response whether paginated or not"
+    if isinstance(response, dict):
+        return response.get("results", [])
+    return response
+
+
 RESOURCES = ("devices", "networks", "interfaces")
 
 
 class NSoTClient:
     """Manage NSoT API client"""
 
-    resource = get_api_client()
-    # iter_sites_attributes = resource.attributes.get()
-    _sites = {site["name"]: int(site["id"]) for site in resource.sites.get()}
+    @LazyAttribute
+    def resource(cls):
+        """The NSoT API client, created on first use. The fake NSoT server is
+        used if enabled in `NSOT_FAKE`"""
+        if C.NSOT_FAKE:
+            return fake.get_api_client()
+        return get_api_client()
+
+    @LazyAttribute
+    def _sites(cls):
+        "The site name and ID pair of NSoT sites, fetched on first use"
+        return {site["name"]: int(site["id"]) for site in cls.fetch("sites")}
+
+    @LazyAttribute
+    def snapshot(cls):
+        "The on-disk snapshot of NSoT resource objects"
+        return Snapshot()
 
     _sites_id_cache = {}
     _endpoints_cache = {}
     _default_site = None
 
     _resource_cache = {}
+    _revalidations = {}
+
+    # the ID of the NSoT change which all the cache objects are up to date
+    _change_id = None
+
+    @classmethod
+    def fetch(cls, name):
+        """Return the NSoT objects of the resource, from the snapshot if enabled
+        in `NSOT_SNAPSHOT` and exists otherwise from the NSoT server"""
+        return list(cls.iter_resource(name))
+
+    @classmethod
+    def iter_resource(cls, name, page_size=None):
+        """
+        Yield the NSoT objects of the resource page by page, from the snapshot
+        if enabled in `NSOT_SNAPSHOT` and exists otherwise from the NSoT server
+        :param name (str): name of the resource ex. networks
+        :param page_size (int): number of objects per request, default to
+            `NSOT_PAGE_SIZE`
+        """
+        track_changes = name in RESOURCES
+
+        if C.NSOT_SNAPSHOT and cls.snapshot.exists(name):
+            if track_changes:
+                cls.track_change_id(cls.snapshot.get_meta(f"{name}.change_id", 0))
+            yield from cls.snapshot.iter_objects(name, page_size)
+            # revalidate after reading so the snapshot is not locked
+            cls.revalidate(name)
+            return None
+
+        # get the latest change before the objects so no change is missed
+        if track_changes:
+            change_id = cls.latest_change_id()
+            cls.track_change_id(change_id)
+
+        # the pages are staged as fetched so the objects are not held in memory
+        if C.NSOT_SNAPSHOT:
+            cls.snapshot.begin(name)
+
+        endpoint = Endpoint(getattr(cls.resource, name), name=name)
+        for page in cls.iter_pages(endpoint, page_size):
+            if C.NSOT_SNAPSHOT:
+                cls.snapshot.stage(name, page)
+            yield from page
+
+        if C.NSOT_SNAPSHOT:
+            cls.snapshot.save(name)
+            if track_changes:
+                cls.snapshot.set_meta(f"{name}.change_id", change_id)
+
+    @staticmethod
+    def iter_pages(endpoint, page_size=None, **kwargs):
+        """
+        Yield the pages of the objects from the endpoint using limit/offset
+        pagination, only one page is held in memory at a time
+        :param endpoint: the NSoT resource API endpoint
+        :param page_size (int): number of objects per request, default to
+            `NSOT_PAGE_SIZE`
+        :param kwargs: query parameters of the request
+        """
+        if page_size is None:
+            page_size = C.NSOT_PAGE_SIZE
+
+        offset = 0
+        while True:
+            response = nsot_request(endpoint.get)(
+                limit=page_size, offset=offset, **kwargs
+            )
+            page = get_results(response)
+            # an empty page has no offset to advance, even if `next` is set
+            if not page:
+                return None
+            yield page
+
+            # a non paginated response has all the objects
+            if not isinstance(response, dict) or not response.get("next"):
+                return None
+
+            offset += len(page)
+
+    @classmethod
+    def latest_change_id(cls):
+        """Return the ID of the latest change in NSoT server, NSoT returns the
+        changes newest first"""
+        endpoint = Endpoint(cls.resource.changes, name="changes")
+        changes = get_results(nsot_request(endpoint.get)(limit=1))
+        return int(changes[0]["id"]) if changes else 0
+
+    @classmethod
+    def track_change_id(cls, change_id):
+        "Keep the oldest change ID which all the cache objects are up to date"
+        if cls._change_id is None or change_id < cls._change_id:
+            cls._change_id = change_id
+
+    @classmethod
+    def apply_change(cls, name, event, nsot_obj):
+        "Apply a NSoT change to the NSoT objects of the resource if fetched"
+        nsot_objects = cls._resource_cache.get(name)
+        if nsot_objects is None:
+            return None
+
+        if event == "Delete":
+            nsot_objects.pop(nsot_obj["id"], None)
+        else:
+            nsot_objects[nsot_obj["id"]] = nsot_obj
+
+    @classmethod
+    def revalidate(cls, name):
+        """Fetch the NSoT objects of the resource in a background thread and
+        update the snapshot, the cache objects of the running process is
+        unchanged"""
+
+        def _revalidate():
+            try:
+                change_id = cls.latest_change_id()
+                endpoint = Endpoint(getattr(cls.resource, name), name=name)
+                changed = cls.snapshot.save(
+                    name, (o for page in cls.iter_pages(endpoint) for o in page)
+                )
+                if name in RESOURCES:
+                    cls.snapshot.set_meta(f"{name}.change_id", change_id)
+                if changed:
+                    logger.info(f"{name} snapshot is stale, sites {changed} updated")
+            except Exception as e:
+                logger.error(f"{name} snapshot revalidation failed: {e}")
+
+        thread = cls._revalidations.get(name)
+        if thread is None or not thread.is_alive():
+            thread = Thread(target=_revalidate, name=f"revalidate-{name}", daemon=True)
+            cls._revalidations[name] = thread
+            thread.start()
+
+        return thread
+
+    @classmethod
+    def wait_revalidation(cls, timeout=None):
+        "Block until the background snapshot revalidation is finished"
+        for thread in list(cls._revalidations.values()):
+            thread.join(timeout)
 
     @classmethod
     def get_resource(cls, name):
         if name not in RESOURCES:
             raise ValueError("Invalud resource: %s" % name)
         if cls._resource_cache.get(name) is None:
-            cls._resource_cache[name] = {
-                r["id"]: r for r in getattr(cls.resource, name).get()
-            }
+            cls._resource_cache[name] = {r["id"]: r for r in cls.iter_resource(name)}
         return cls._resource_cache[name]
 
     @classmethod
@@ -110,9 +338,11 @@ class NSoTClient:
 
         key = resource_name, site_name
         if cls._endpoints_cache.get(key) is None:
-            site_id = cls.get_site_id(site_name)
-            cls._endpoints_cache[key] = getattr(
-                cls.resource.sites(site_id), resource_name
+            site_id = cls.get_siteid(site_name)
+            cls._endpoints_cache[key] = Endpoint(
+                getattr(cls.resource.sites(site_id), resource_name),
+                site_id,
+                resource_name,
             )
         return cls._endpoints_cache[key]
 
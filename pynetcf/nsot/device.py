@@ -2,15 +2,27 @@ from .resource import Resource
 
 
 class Device(Resource):
+    __slots__ = ()
+
     _args = ("hostname", "site_id")
 
+    # instance attributes
+    _fields = ("interfaces",)
+
     @classmethod
     def _check_args(cls, attrs):
         attrs.interfaces = {}
 
+    def _hydrate_interfaces(self):
+        "Create the interfaces of this device that are still raw records"
+        model = Resource._models.get("interfaces")
+        if model is not None:
+            model.manager._objects.hydrate_index("device", self._key)
+
     @property
     def interfaces(self):
         """Manipulate object arguments before creating the instance"""
+        self._hydrate_interfaces()
         return tuple(self._attrs.interfaces.values())
 
     def get_interface(self, ifname):
@@ -18,6 +30,7 @@ class Device(Resource):
         Get a single interface from this device
         :param if_name (str): name of the interface
         """
+        self._hydrate_interfaces()
         return self._attrs.interfaces.get(ifname)
 
     def add_interface(self, ifobj):
@@ -28,6 +41,7 @@ class Device(Resource):
         Remove interface to this device
         param if_name (str): name of the interface
         """
+        self._hydrate_interfaces()
         try:
             self._attrs.interfaces[ifname].delete()
             del self._attrs.interfaces[ifname]
@@ -42,6 +56,7 @@ class Device(Resource):
         """
 
         if force:
+            self._hydrate_interfaces()
             for iface in sorted(
                 self._attrs.interfaces.values(),
                 key=lambda x: not x.is_subinterface(),
@@ -0,0 +1,94 @@
+import json
+import time
+
+from .metrics import metrics
+from .ratelimit import limiter
+from .retry import get_status, is_server_failure
+
+HTTP_METHODS = ("get", "head", "options", "post", "put", "patch", "delete")
+
+
+def payload_size(data):
+    "Return the size in bytes of the JSON payload"
+    if data is None:
+        return 0
+    return len(json.dumps(data, default=str))
+
+
+class Endpoint:
+    """Wrap a NSoT API endpoint to rate limit and record the metrics of its
+    requests per resource, site and method
+
+    Calling the endpoint ex. `endpoint(id)` and getting a sub resource returns
+    a wrapped endpoint of the same site.
+    """
+
+    def __init__(self, endpoint, site_id=None, name=None):
+        self._endpoint = endpoint
+        self._site_id = site_id
+        self._name = name
+
+    def __repr__(self):
+        return f"Endpoint({self._name}, site_id={self._site_id})"
+
+    def __call__(self, *args, **kwargs):
+        return Endpoint(self._endpoint(*args, **kwargs), self._site_id, self._name)
+
+    def __getattr__(self, name):
+        attr = getattr(self._endpoint, name)
+
+        if name in HTTP_METHODS:
+            return self._request(name.upper(), attr)
+
+        # a sub resource of the endpoint
+        if not name.startswith("_") and callable(getattr(attr, "get", None)):
+            return Endpoint(attr, self._site_id, name)
+
+        return attr
+
+    def _request(self, method, request_func):
+        """Return the request method that wait for the rate limit of the site
+        and record the request metrics"""
+
+        def wrapper(*args, **kwargs):
+            bucket = limiter.bucket(self._site_id, method)
+            if bucket is not None:
+                bucket.acquire()
+
+            concurrency = limiter.concurrency(self._site_id)
+            if concurrency is not None:
+                concurrency.acquire()
+
+            data = args[0] if args else kwargs.get("data")
+            start = time.monotonic()
+            try:
+                result = request_func(*args, **kwargs)
+            except Exception as e:
+                latency = time.monotonic() - start
+                if concurrency is not None:
+                    concurrency.release(latency, is_server_failure(e))
+                metrics.record(
+                    self._name,
+                    method,
+                    self._site_id,
+                    get_status(e) or "error",
+                    latency,
+                    payload_size(data),
+                )
+                raise
+
+            latency = time.monotonic() - start
+            if concurrency is not None:
+                concurrency.release(latency)
+            metrics.record(
+                self._name,
+                method,
+                self._site_id,
+                "ok",
+                latency,
+                payload_size(data),
+                payload_size(result),
+            )
+            return result
+
+        return wrapper
@@ -0,0 +1,758 @@
+import ipaddress
+import itertools
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from threading import RLock
+
+import requests
+from slumber.exceptions import HttpClientError, HttpNotFoundError, HttpServerError
+
+from pynetcf.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BASE_URL = "http://nsot.fake/api"
+
+# the resources of the fake server and the model name of the NSoT changes
+RESOURCES = {
+    "sites": "Site",
+    "attributes": "Attribute",
+    "devices": "Device",
+    "networks": "Network",
+    "interfaces": "Interface",
+}
+
+# the fields of a resource object that can be set by POST, PUT and PATCH and
+# their default values
+WRITABLE_FIELDS = {
+    "sites": {"name": None, "description": ""},
+    "attributes": {
+        "name": None,
+        "resource_name": None,
+        "description": "",
+        "display": True,
+        "required": False,
+        "multi": False,
+        "constraints": {"pattern": "", "valid_values": [], "allow_empty": False},
+    },
+    "devices": {"hostname": None, "attributes": {}},
+    "networks": {"state": "allocated", "attributes": {}},
+    "interfaces": {
+        "name": None,
+        "device": None,
+        "parent_id": None,
+        "addresses": [],
+        "mac_address": None,
+        "description": "",
+        "speed": 1000,
+        "type": 6,
+        "attributes": {},
+    },
+}
+
+_MISSING = object()
+
+
+class FakeNSoTError(Exception):
+    "An error response of the fake NSoT server"
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _copy(obj):
+    "Return a copy of the object safe to be modified by the caller"
+    return {k: v.copy() if isinstance(v, (dict, list)) else v for k, v in obj.items()}
+
+
+def _ip_network(cidr):
+    "Return the `ipaddress` network of the CIDR, a bare IP address is a host"
+    try:
+        return ipaddress.ip_network(cidr)
+    except (TypeError, ValueError) as e:
+        raise FakeNSoTError(400, f"Invalid CIDR {cidr!r}: {e}")
+
+
+class FakeNSoT:
+    """In-memory stand-in of the NSoT server
+
+    Implements the sites, attributes, devices, networks, interfaces and changes
+    endpoints that pynetcf use, including limit/offset pagination, bulk POST,
+    PUT and PATCH of a list of objects and the NSoT error responses. A bulk
+    request is atomic, all the objects are rolled back if one of them fails.
+
+    The objects are never changed in place, an update replaces the object so a
+    transaction is rolled back by restoring the replaced entries.
+    """
+
+    def __init__(self, sites=("default",), latency=0, strict_attributes=True):
+        """
+        :param sites (list): names of the sites to create, the first site is
+            the `default_site`
+        :param latency (float): seconds to wait on every request to simulate
+            the network round trip
+        :param strict_attributes (bool): `True` will reject the resource
+            attributes that is not created in the attributes endpoint like NSoT
+        """
+        self._lock = RLock()
+        self.latency = latency
+        self.strict_attributes = strict_attributes
+        self.reset(sites)
+
+    def reset(self, sites=("default",)):
+        "Remove all the objects and create the sites"
+        with self._lock:
+            self._objects = {name: {} for name in RESOURCES}
+            self._keys = {name: {} for name in RESOURCES}
+            self._children = {name: defaultdict(dict) for name in RESOURCES}
+            self._changes = []
+            self._ids = defaultdict(lambda: itertools.count(1))
+            self._change_ids = itertools.count(1)
+            self._journal = None
+            self._recording = True
+            self._errors = []
+            self.requests = Counter()
+
+            for site in sites:
+                self._create("sites", {"name": site}, None)
+
+            self.default_site = 1 if sites else None
+
+    def load(self, data, changes=False):
+        """
+        Create the objects without HTTP requests ex. to seed an inventory, the
+        resources are created in the order of `RESOURCES`
+        :param data (dict): list or generator of objects key by the resource
+            name, each object has the `site_id`
+        :param changes (bool): `True` will record the NSoT changes of the
+            created objects
+        """
+        with self._lock:
+            self._recording = changes
+            try:
+                for name in RESOURCES:
+                    for payload in data.get(name, []):
+                        self._create(name, payload, payload.get("site_id"))
+            finally:
+                self._recording = True
+
+    def inject_error(self, status, method=None, resource=None, count=1, headers=None):
+        """
+        Fail the next matching requests with an error response
+        :param status (int): the HTTP status of the error response
+        :param method (str): the HTTP method to fail, `None` match any method
+        :param resource (str): the resource to fail, `None` match any resource
+        :param count (int): number of requests to fail
+        :param headers (dict): the headers of the error response ex. Retry-After
+        """
+        with self._lock:
+            self._errors.append([status, method, resource, count, headers or {}])
+
+    def _pop_error(self, method, name):
+        "Return the status and headers of an injected error of the request"
+        for error in self._errors:
+            status, err_method, resource, _, headers = error
+            if err_method in (None, method) and resource in (None, name):
+                error[3] -= 1
+                if error[3] <= 0:
+                    self._errors.remove(error)
+                return status, headers
+        return None
+
+    def request(self, method, path, data=None, params=None):
+        """
+        Handle a single API request and return the response body
+        :param method (str): the HTTP method
+        :param path (tuple): the URL segments ex. ("sites", 1, "networks", 5)
+        :param data (dict|list): the request payload
+        :param params (dict): the query parameters
+        :raise HttpClientError: on 4xx error response like slumber
+        :raise HttpServerError: on 5xx error response like slumber
+        """
+        params = dict(params or {})
+        url = "/".join([BASE_URL, *[str(p) for p in path]]) + "/"
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            try:
+                site_id, name, obj_id = self._parse_path(path)
+                self.requests[method, name] += 1
+
+                error = self._pop_error(method, name)
+                if error:
+                    status, headers = error
+                    return self._raise(
+                        method, url, data, status, "Injected error", headers
+                    )
+
+                return self._dispatch(method, name, site_id, obj_id, data, params)
+            except FakeNSoTError as e:
+                return self._raise(method, url, data, e.status, e.message)
+
+    def _parse_path(self, path):
+        "Return the site ID, resource name and object ID of the URL segments"
+        path = list(path)
+        site_id = obj_id = None
+
+        if len(path) > 2 and path[0] == "sites":
+            site_id = int(path[1])
+            if site_id not in self._objects["sites"]:
+                raise FakeNSoTError(404, f"Site {site_id} not found")
+            path = path[2:]
+
+        if not path or path[0] not in (*RESOURCES, "changes") or len(path) > 2:
+            raise FakeNSoTError(404, "Not found")
+
+        if len(path) == 2:
+            try:
+                obj_id = int(path[1])
+            except (TypeError, ValueError):
+                raise FakeNSoTError(404, f"Invalid ID {path[1]!r}")
+
+        return site_id, path[0], obj_id
+
+    def _raise(self, method, url, data, status, message, headers=None):
+        "Raise the slumber exception of the error response"
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response._content = json.dumps(
+            {"error": {"code": status, "message": message}}
+        ).encode()
+        response.headers.update({"Content-Type": "application/json", **(headers or {})})
+        response.request = requests.Request(method, url, json=data).prepare()
+
+        if status == 404:
+            exc_class = HttpNotFoundError
+        elif status < 500:
+            exc_class = HttpClientError
+        else:
+            exc_class = HttpServerError
+
+        logger.info(f"[FakeNSoT] {method} {url} {status} {message}")
+        raise exc_class(
+            f"Error {status}: {url}", response=response, content=response.content
+        )
+
+    def _dispatch(self, method, name, site_id, obj_id, data, params):
+        "Call the handler of the request and return the response body"
+        if name == "changes":
+            if method != "GET":
+                raise FakeNSoTError(405, f"Method {method} not allowed")
+            if obj_id is not None:
+                return self._get_change(obj_id)
+            return self._paginate(list(reversed(self._changes)), params)
+
+        if method == "GET":
+            if obj_id is not None:
+                return _copy(self._get(name, obj_id, site_id))
+            objects = self._filter(name, site_id, params)
+            return self._paginate(objects, params)
+
+        if method == "POST" and obj_id is None:
+            if isinstance(data, list):
+                return self._transaction(
+                    [lambda p=p: self._create(name, p, site_id) for p in data]
+                )
+            return self._transaction(lambda: self._create(name, data, site_id))
+
+        if method in ("PUT", "PATCH"):
+            replace = method == "PUT"
+            if obj_id is not None:
+                return self._transaction(
+                    lambda: self._update(name, obj_id, data, site_id, replace)
+                )
+            if isinstance(data, list):
+                return self._transaction(
+                    [
+                        lambda p=p: self._update(
+                            name, self._payload_id(p), p, site_id, replace
+                        )
+                        for p in data
+                    ]
+                )
+
+        if method == "DELETE" and obj_id is not None:
+            force = str(params.get("force_delete", "")).lower() in ("1", "true")
+            self._transaction(lambda: self._delete(name, obj_id, site_id, force))
+            return True
+
+        raise FakeNSoTError(405, f"Method {method} not allowed")
+
+    def _transaction(self, handlers):
+        """
+        Call the handlers atomically, the changes are rolled back on error
+        :param handlers (callable|list): a handler or list of handlers
+        :return: the result of the handler or list of results
+        """
+        bulk = isinstance(handlers, list)
+        self._journal = []
+        changes_count = len(self._changes)
+        try:
+            if bulk:
+                return [_copy(handler()) for handler in handlers]
+            return _copy(handlers())
+        except Exception:
+            for table, key, old in reversed(self._journal):
+                if old is _MISSING:
+                    table.pop(key, None)
+                else:
+                    table[key] = old
+            del self._changes[changes_count:]
+            raise
+        finally:
+            self._journal = None
+
+    def _write(self, table, key, value=_MISSING):
+        "Set or remove the key of the table and record the old value"
+        if self._journal is not None:
+            self._journal.append((table, key, table.get(key, _MISSING)))
+        if value is _MISSING:
+            table.pop(key, None)
+        else:
+            table[key] = value
+
+    @staticmethod
+    def _payload_id(payload):
+        try:
+            return int(payload["id"])
+        except (KeyError, TypeError, ValueError):
+            raise FakeNSoTError(400, "Bulk update requires the 'id' of each object")
+
+    def _paginate(self, objects, params):
+        "Return the list of objects or a page if the limit is given"
+        limit = params.get("limit")
+        if limit is None:
+            return [_copy(o) for o in objects]
+
+        limit = int(limit)
+        offset = int(params.get("offset", 0))
+        page = objects[offset : offset + limit]
+
+        def url(offset):
+            return f"{BASE_URL}/?limit={limit}&offset={offset}"
+
+        return {
+            "count": len(objects),
+            "next": url(offset + limit) if offset + limit < len(objects) else None,
+            "previous": url(max(offset - limit, 0)) if offset else None,
+            "results": [_copy(o) for o in page],
+        }
+
+    def _filter(self, name, site_id, params):
+        "Return the objects of the resource and site that match the params"
+        filters = {
+            k: str(v) for k, v in params.items() if k not in ("limit", "offset")
+        }
+        objects = []
+        for obj in self._objects[name].values():
+            if site_id is not None and name != "sites" and obj["site_id"] != site_id:
+                continue
+            if all(str(obj.get(k)) == v for k, v in filters.items()):
+                objects.append(obj)
+        return objects
+
+    def _get(self, name, obj_id, site_id):
+        "Return the stored object or raise 404"
+        obj = self._objects[name].get(obj_id)
+        if obj is None or (
+            site_id is not None and name != "sites" and obj["site_id"] != site_id
+        ):
+            raise FakeNSoTError(404, f"{RESOURCES[name]} {obj_id} not found")
+        return obj
+
+    def _get_change(self, change_id):
+        for change in self._changes:
+            if change["id"] == change_id:
+                return change
+        raise FakeNSoTError(404, f"Change {change_id} not found")
+
+    def _record_change(self, name, event, obj):
+        "Append the NSoT change of the object"
+        if name == "sites" or not self._recording:
+            return None
+        self._changes.append(
+            {
+                "id": next(self._change_ids),
+                "event": event,
+                "resource_name": RESOURCES[name],
+                "resource_id": obj["id"],
+                "resource": _copy(obj),
+                "site": obj["site_id"],
+                "user": {"email": "fake@localhost"},
+                "change_at": datetime.now(timezone.utc).timestamp(),
+            }
+        )
+
+    def _site_id(self, payload, site_id):
+        "Return the site of the object from the URL or the payload"
+        site_id = site_id or payload.get("site_id")
+        if site_id is None:
+            raise FakeNSoTError(400, "This field is required: site_id")
+        site_id = int(site_id)
+        if site_id not in self._objects["sites"]:
+            raise FakeNSoTError(400, f"Site {site_id} does not exist")
+        return site_id
+
+    def _fields(self, name, payload, old=None, replace=False):
+        "Return the writable fields of the payload merged with the old object"
+        fields = {}
+        for field, default in WRITABLE_FIELDS[name].items():
+            if field in payload:
+                value = payload[field]
+            elif old is not None and not replace:
+                value = old.get(field, default)
+            else:
+                value = default
+            fields[field] = value.copy() if isinstance(value, (dict, list)) else value
+        return fields
+
+    def _create(self, name, payload, site_id):
+        "Create a single object and return it"
+        if not isinstance(payload, dict):
+            raise FakeNSoTError(400, "Expected an object")
+
+        obj = {"id": next(self._ids[name]), **self._fields(name, payload)}
+
+        if name != "sites":
+            obj["site_id"] = self._site_id(payload, site_id)
+
+        if name == "networks":
+            obj.update(self._network_fields(payload, obj["site_id"]))
+
+        obj = self._validate(name, obj)
+        self._save(name, obj)
+
+        if name == "networks":
+            self._adopt_subnets(obj)
+
+        self._record_change(name, "Create", obj)
+        return obj
+
+    def _update(self, name, obj_id, payload, site_id, replace=False):
+        "Update a single object and return it"
+        if not isinstance(payload, dict):
+            raise FakeNSoTError(400, "Expected an object")
+
+        old = self._get(name, obj_id, site_id)
+        obj = {**old, **self._fields(name, payload, old, replace)}
+
+        obj = self._validate(name, obj)
+        self._save(name, obj, old)
+        self._record_change(name, "Update", obj)
+        return obj
+
+    def _delete(self, name, obj_id, site_id, force=False):
+        """Delete a single object, the dependents are deleted or reparented if
+        forced otherwise raise 409"""
+        obj = self._get(name, obj_id, site_id)
+
+        if name == "sites":
+            for resource, objects in self._objects.items():
+                if resource != "sites" and any(
+                    o["site_id"] == obj_id for o in objects.values()
+                ):
+                    raise FakeNSoTError(409, f"Site {obj_id} has {resource}")
+
+        dependents = self._dependents(name, obj)
+        if dependents and not force:
+            raise FakeNSoTError(
+                409, f"Cannot delete {RESOURCES[name]} {obj_id} with dependents"
+            )
+
+        for dependent in dependents:
+            if name == "networks":
+                self._reparent(dependent, obj["parent_id"])
+            else:
+                self._delete("interfaces", dependent["id"], None, force=True)
+
+        # the deleted IP address is removed from the interfaces
+        if name == "networks" and obj["is_ip"]:
+            for iface in list(self._objects["interfaces"].values()):
+                if iface["site_id"] == obj["site_id"] and obj["cidr"] in iface[
+                    "addresses"
+                ]:
+                    addresses = [a for a in iface["addresses"] if a != obj["cidr"]]
+                    self._update(
+                        "interfaces", iface["id"], {"addresses": addresses}, None
+                    )
+
+        self._unindex(name, obj)
+        self._write(self._objects[name], obj_id)
+        self._record_change(name, "Delete", obj)
+        return obj
+
+    def _dependents(self, name, obj):
+        "Return the objects that depend on the object"
+        if name == "devices":
+            ids = self._children["interfaces"].get(("device", obj["id"]), {})
+            name = "interfaces"
+        elif name in ("networks", "interfaces"):
+            ids = self._children[name].get(obj["id"], {})
+        else:
+            return []
+        return [self._objects[name][i] for i in list(ids)]
+
+    def _natural_key(self, name, obj):
+        "Return the unique key of the object"
+        if name == "sites":
+            return obj["name"]
+        if name == "attributes":
+            return obj["site_id"], obj["resource_name"], obj["name"]
+        if name == "devices":
+            return obj["site_id"], obj["hostname"]
+        if name == "networks":
+            return obj["site_id"], obj["cidr"]
+        return obj["site_id"], obj["device"], obj["name"]
+
+    def _parent_keys(self, name, obj):
+        """Return the keys of the children index that the object belongs to, the
+        root networks of a site are under the site key"""
+        if name == "networks":
+            return [obj["parent_id"] or ("site", obj["site_id"])]
+        if name == "interfaces":
+            keys = [("device", obj["device"])]
+            if obj["parent_id"]:
+                keys.append(obj["parent_id"])
+            return keys
+        return []
+
+    def _save(self, name, obj, old=None):
+        "Store the object and update the indexes"
+        key = self._natural_key(name, obj)
+        existing = self._keys[name].get(key)
+        if existing is not None and existing != obj["id"]:
+            raise FakeNSoTError(409, f"{RESOURCES[name]} {key} already exists")
+
+        if old is not None:
+            self._unindex(name, old)
+
+        self._write(self._keys[name], key, obj["id"])
+        self._write(self._objects[name], obj["id"], obj)
+        for parent_key in self._parent_keys(name, obj):
+            self._write(self._children[name][parent_key], obj["id"], True)
+
+    def _unindex(self, name, obj):
+        "Remove the object from the indexes"
+        self._write(self._keys[name], self._natural_key(name, obj))
+        for parent_key in self._parent_keys(name, obj):
+            self._write(self._children[name][parent_key], obj["id"])
+
+    def _validate(self, name, obj):
+        "Check the fields of the object and return the object to save"
+        for field in ("name", "hostname", "resource_name", "device"):
+            if field in WRITABLE_FIELDS[name] and obj.get(field) in (None, ""):
+                raise FakeNSoTError(400, f"This field is required: {field}")
+
+        if name == "attributes" and obj["resource_name"] not in RESOURCES.values():
+            raise FakeNSoTError(
+                400, f"Invalid resource name {obj['resource_name']!r}"
+            )
+
+        if "attributes" in obj:
+            self._validate_attributes(name, obj)
+
+        if name == "interfaces":
+            obj = {**obj, **self._interface_fields(obj)}
+
+        return obj
+
+    def _validate_attributes(self, name, obj):
+        "Check the resource attributes exists and the values like NSoT"
+        if not isinstance(obj["attributes"], dict):
+            raise FakeNSoTError(400, "Attributes must be a dictionary")
+
+        if not self.strict_attributes:
+            return None
+
+        for attr_name, value in obj["attributes"].items():
+            key = obj["site_id"], RESOURCES[name], attr_name
+            attr_id = self._keys["attributes"].get(key)
+            if attr_id is None:
+                raise FakeNSoTError(
+                    400, f"Attribute name ({attr_name}) does not exist."
+                )
+
+            attr = self._objects["attributes"][attr_id]
+            if attr["multi"] != isinstance(value, list):
+                raise FakeNSoTError(
+                    400, f"Attribute {attr_name} multi is {attr['multi']}"
+                )
+
+            valid_values = attr["constraints"].get("valid_values")
+            for v in value if attr["multi"] else [value]:
+                if valid_values and v not in valid_values:
+                    raise FakeNSoTError(
+                        400, f"Attribute {attr_name} invalid value {v!r}"
+                    )
+
+    def _network_fields(self, payload, site_id):
+        "Return the computed fields of a new network"
+        cidr = payload.get("cidr")
+        if cidr is None:
+            cidr = f"{payload.get('network_address')}/{payload.get('prefix_length')}"
+
+        net = _ip_network(cidr)
+        is_ip = net.prefixlen == net.max_prefixlen
+
+        return {
+            "cidr": str(net),
+            "network_address": str(net.network_address),
+            "prefix_length": net.prefixlen,
+            "ip_version": str(net.version),
+            "is_ip": is_ip,
+            "state": payload.get("state") or ("assigned" if is_ip else "allocated"),
+            **self._parent_fields(self._find_parent(site_id, net)),
+        }
+
+    def _parent_fields(self, parent_id):
+        parent = self._objects["networks"].get(parent_id)
+        return {"parent_id": parent_id, "parent": parent["cidr"] if parent else None}
+
+    def _find_parent(self, site_id, net):
+        "Return the ID of the longest prefix network that contains the network"
+        keys = self._keys["networks"]
+        for prefixlen in range(net.prefixlen - 1, -1, -1):
+            parent_id = keys.get((site_id, str(net.supernet(new_prefix=prefixlen))))
+            if parent_id is not None:
+                return parent_id
+        return None
+
+    def _adopt_subnets(self, obj):
+        """Move the subnets of the parent network that is within the new network
+        under the new network like NSoT"""
+        net = _ip_network(obj["cidr"])
+        parent_key = self._parent_keys("networks", obj)[0]
+
+        for child_id in list(self._children["networks"].get(parent_key, {})):
+            child = self._objects["networks"][child_id]
+            if child_id == obj["id"] or child["ip_version"] != obj["ip_version"]:
+                continue
+            if _ip_network(child["cidr"]).subnet_of(net):
+                self._reparent(child, obj["id"])
+
+    def _reparent(self, obj, parent_id):
+        "Move the network under a new parent network"
+        self._unindex("networks", obj)
+        self._save("networks", {**obj, **self._parent_fields(parent_id)})
+
+    def _interface_fields(self, obj):
+        "Return the computed fields of the interface"
+        site_id = obj["site_id"]
+
+        device = obj["device"]
+        if str(device).isdigit():
+            device_id = int(device)
+        else:
+            device_id = self._keys["devices"].get((site_id, device))
+        device = self._objects["devices"].get(device_id)
+        if device is None or device["site_id"] != site_id:
+            raise FakeNSoTError(400, f"Device {obj['device']!r} does not exist")
+
+        parent = None
+        if obj["parent_id"]:
+            parent = self._objects["interfaces"].get(int(obj["parent_id"]))
+            if parent is None or parent["device"] != device_id:
+                raise FakeNSoTError(
+                    400, f"Parent interface {obj['parent_id']} does not exist"
+                )
+
+        addresses = []
+        networks = set()
+        for addr in obj["addresses"]:
+            net = _ip_network(addr)
+            if net.prefixlen != net.max_prefixlen:
+                raise FakeNSoTError(400, f"{addr} is not a host address")
+
+            cidr = str(net)
+            addr_id = self._keys["networks"].get((site_id, cidr))
+            if addr_id is None:
+                address = self._create("networks", {"cidr": cidr}, site_id)
+            else:
+                address = self._objects["networks"][addr_id]
+                if address["state"] != "assigned":
+                    address = self._update(
+                        "networks", addr_id, {"state": "assigned"}, None
+                    )
+
+            addresses.append(cidr)
+            if address["parent"]:
+                networks.add(address["parent"])
+
+        return {
+            "device": device_id,
+            "device_hostname": device["hostname"],
+            "parent_id": parent["id"] if parent else None,
+            "parent": parent["name"] if parent else None,
+            "addresses": addresses,
+            "networks": sorted(networks),
+            "name_slug": f"{device['hostname']}:{obj['name']}",
+        }
+
+
+class FakeEndpoint:
+    """A slumber like endpoint of the fake NSoT server ex.
+    `api.sites(1).networks(5).patch(payload)`"""
+
+    def __init__(self, server, path):
+        self._server = server
+        self._path = path
+
+    def __repr__(self):
+        return f"FakeEndpoint({'/'.join(str(p) for p in self._path)})"
+
+    def __call__(self, id=None):
+        if id is None:
+            return self
+        return FakeEndpoint(self._server, self._path + (id,))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return FakeEndpoint(self._server, self._path + (name,))
+
+    def get(self, **kwargs):
+        return self._server.request("GET", self._path, params=kwargs)
+
+    def post(self, data=None, **kwargs):
+        return self._server.request("POST", self._path, data, kwargs)
+
+    def put(self, data=None, **kwargs):
+        return self._server.request("PUT", self._path, data, kwargs)
+
+    def patch(self, data=None, **kwargs):
+        return self._server.request("PATCH", self._path, data, kwargs)
+
+    def delete(self, **kwargs):
+        return self._server.request("DELETE", self._path, params=kwargs)
+
+
+class FakeAPIClient:
+    "A pynsot like API client of the fake NSoT server"
+
+    def __init__(self, server):
+        self._server = server
+
+    @property
+    def default_site(self):
+        return self._server.default_site
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return FakeEndpoint(self._server, (name,))
+
+
+# the fake NSoT server of the process when `NSOT_FAKE` is enabled
+server = FakeNSoT()
+
+
+def get_api_client():
+    "Return an API client of the fake NSoT server like `pynsot.get_api_client`"
+    return FakeAPIClient(server)
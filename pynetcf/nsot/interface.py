@@ -15,9 +15,21 @@ logger = get_logger(__name__)
 class Interface(Resource):
     """A single Interface"""
 
+    __slots__ = ("network_assignment",)
+
     # instance arguments
     _args = ("device", "name", "site_id")
 
+    # instance attributes
+    _fields = (
+        "_device",
+        "_sub_interfaces",
+        "_old_addresses",
+        "_addresses",
+        "_networks",
+        "parent",
+    )
+
     @classmethod
     def _check_args(cls, attrs):
         """Manipulate object arguments before creating the instance"""
@@ -29,6 +41,33 @@ class Interface(Resource):
         except ValueError:
             return None
 
+    @classmethod
+    def _nsot_key(cls, nsot_obj):
+        "Return the resource key of the NSoT object"
+        hostname = nsot_obj.get("device_hostname")
+        if hostname is None:
+            device = Device.manager._objects.get_by_id(int(nsot_obj["device"]))
+            hostname = device.hostname
+        return hostname, nsot_obj.get("name"), nsot_obj.get("site_id")
+
+    @classmethod
+    def _raw_indexes(cls, key, nsot_obj):
+        """Return the indexes of the raw record, the interfaces of a device and
+        the sub interfaces are created from the raw records on demand"""
+        hostname, name, site_id = key
+        yield "device", (hostname, site_id)
+        if "." in name:
+            yield "parent", (hostname, name.split(".")[0], site_id)
+
+    @classmethod
+    def _get_addresses(cls, addrs, site_id):
+        "Return the address and network objects of the IP addresses"
+        addrs = {
+            addr: Network.manager._objects.get((addr, site_id)) for addr in addrs
+        }
+        networks = tuple(a.parent for a in addrs.values())
+        return addrs, networks
+
     @classmethod
     def _pre_init(cls, obj):
         """Manipulate specific resource instance attributes before returning"""
@@ -43,27 +82,26 @@ class Interface(Resource):
         device.add_interface(obj)
 
         # get the network object
-        addrs = {
-            addr: Network.manager._objects.get((addr, obj.site_id))
-            for addr in obj.addresses
-        }
-        networks = tuple(a.parent for a in addrs.values())
+        addrs, networks = cls._get_addresses(obj.addresses, obj.site_id)
 
         # get the parent interface object
         try:
             ifname, _ = obj.name.split(".")
             parent_key = obj.device, ifname, obj.site_id
             parent = cls.manager._objects.get(parent_key) or cls(*parent_key)
+            if not parent._sub_interfaces:
+                parent._attrs._sub_interfaces = []
             parent._sub_interfaces.append(obj)
         except ValueError:
             parent = None
 
         obj._attrs.pop("_device", None)
 
+        # the containers are created on first use, most interfaces has none
         obj._attrs.update(
             {
-                "_sub_interfaces": [],
-                "_old_addresses": set(),
+                "_sub_interfaces": (),
+                "_old_addresses": (),
                 "_addresses": addrs,
                 "_networks": networks,
                 "parent": parent,
@@ -75,17 +113,50 @@ class Interface(Resource):
         # this is to assigned addresses automatically
         obj.network_assignment = None
 
+    def _sync(self, old_nsot_obj):
+        "Update the addresses if it has changed in the NSoT server"
+        addrs = self._nsot_obj.get("addresses", [])
+        if addrs != old_nsot_obj.get("addresses", []):
+            addrs, networks = self._get_addresses(addrs, self.site_id)
+            self._attrs.update({"_addresses": addrs, "_networks": networks})
+
+    def _unlink(self):
+        "Remove the interface from the device and the parent interface"
+        self.device._attrs.interfaces.pop(self.name, None)
+        try:
+            self.parent._sub_interfaces.remove(self)
+        except (AttributeError, ValueError):
+            pass
+
+    def _add_old_addresses(self, addrs):
+        "Keep the removed addresses to update their state to orphaned"
+        self._attrs._old_addresses = {*self._old_addresses, *addrs}
+
     def is_sub_interface(self):
         """Return `True` if this interface is derived from parent
         interface else `False`"""
         return bool(self.parent)
 
+    def _hydrate_sub_interfaces(self):
+        "Create the sub interfaces of this interface that are still raw records"
+        self.manager._objects.hydrate_index("parent", self._key)
+
     def is_parent(self):
         "Return `True` if this interface has sub interfaces else `False`"
+        self._hydrate_sub_interfaces()
         return bool(self._sub_interfaces)
 
-    def update_post(self):
-        """POST or UPDATE interface in NSoT server"""
+    def _dependencies(self):
+        """Return the objects that must exists in NSoT server before this
+        interface"""
+        dependencies = [self.device, *self._addresses.values()]
+        if self.parent:
+            dependencies.append(self.parent)
+        return [obj for obj in dependencies if obj is not None]
+
+    def _pre_update(self):
+        """POST the device, parent interface and addresses of this interface if
+        not yet exists in NSoT server before POST or UPDATE"""
         device = self.device
         parent = self.parent
 
@@ -113,9 +184,7 @@ class Interface(Resource):
             addr.state = "orphaned"
             addr.update_post()
 
-        self._attrs.old_addresses = set()
-
-        super().update_post()
+        self._attrs._old_addresses = ()
 
     def delete(self, force=False):
         """
@@ -125,21 +194,22 @@ class Interface(Resource):
         """
         if force:
             # delete all sub interfaces belong to this interface being deleted
-            for subif in self._attrs.sub_interfaces:
+            self._hydrate_sub_interfaces()
+            for subif in list(self._sub_interfaces):
                 subif.delete()
 
-            self._attrs.sub_interfaces = []
+            self._attrs._sub_interfaces = ()
 
         # update the state of old addresses if any
-        for addr in self._attrs.old_addresses:
+        for addr in self._old_addresses:
             addr.state = "orphaned"
-            addr.post_update()
+            addr.update_post()
 
         super().delete()
 
         # clear caches
         self._attrs._addresses = {}
-        self._attrs._old_interfaces = {}
+        self._attrs._old_addresses = ()
 
         # TODO: delete mac address in the database
         # self._mac_address = None
@@ -157,7 +227,9 @@ class Interface(Resource):
 
         if cidr is None:
             if self.network_assignment:
-                cidr = Network.manager.get(assignment=self.network_assignment)
+                cidr = Network.manager.get(
+                    attributes__assignment=self.network_assignment
+                )
             elif self._networks:
                 cidr = self._networks[0]
             param = cidr._key, (random, reverse)
@@ -168,6 +240,7 @@ class Interface(Resource):
         addr = next(hosts)
 
         self._addresses[str(addr)] = addr
+        self._mark_dirty()
 
         try:
             self._payload["addresses"].append(str(addr))
@@ -182,6 +255,7 @@ class Interface(Resource):
         for addr in args:
             net = Network(addr, self.site_id)
             self._addresses[net.cidr] = net
+        self._mark_dirty()
 
         try:
             self._payload["addresses"].extend(args)
@@ -195,6 +269,7 @@ class Interface(Resource):
         """
 
         new_addrs = set(self._addresses) - set(args)
+        self._mark_dirty()
 
         try:
             self._payload["addresses"].extend(new_addrs)
@@ -202,7 +277,7 @@ class Interface(Resource):
             self._payload["addresses"] = list(new_addrs)
 
         for addr in args:
-            self._old_addresses.add(Network(addr, self.site_id))
+            self._add_old_addresses([Network(addr, self.site_id)])
             try:
                 del self._addresses[addr]
             except KeyError:
@@ -216,17 +291,17 @@ class Interface(Resource):
         # the diff of addresses
         del_addrs = set(self._addresses) - set(addrs)
         # add the diff of addresses to old_addresses for later purposes
-        self._old_addresses.update({self._addresses.get(a) for a in del_addrs})
+        self._add_old_addresses([self._addresses.get(a) for a in del_addrs])
 
-        self._addresses = {
+        self._attrs._addresses = {
             a: Network.manager._objects.get((a, self.site_id)) for a in addrs
         }
         self._payload["addresses"] = addrs
 
     def _delete_addresses(self):
         # add the current address to old addresses for later purposes
-        self._old_addresses.update(self._addresses.values())
-        self._attrs.addresses = {}
+        self._add_old_addresses(self._addresses.values())
+        self._attrs._addresses = {}
         self._payload["addresses"] = []
 
 
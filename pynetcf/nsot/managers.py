@@ -1,6 +1,7 @@
 from collections import defaultdict
 
-from pynetcf.utils import filter_object, get_object
+from pynetcf.utils import filter_objects, get_objects, LazyAttribute
+from pynetcf.utils.query import Query
 from .client import NSoTClient
 from .attribute import Attribute
 
@@ -38,10 +39,10 @@ class SiteResourceManager:
         return self.__call__(key)
 
     def filter(self, **kwargs):
-        yield from filter_object(list(self._objects.values()), **kwargs)
+        yield from filter_objects(list(self._objects.values()), **kwargs)
 
     def get(self, **kwargs):
-        return get_object(list(self._objects.values()), **kwargs)
+        return get_objects(list(self._objects.values()), **kwargs)
 
     def add(self, *args, **kwargs):
         key = ":".join(args)
@@ -67,10 +68,10 @@ class SiteAttributeManager:
         return self._attributes[name]
 
     def filter(self, **kwargs):
-        yield from filter_object(list(self._attributes.values()), **kwargs)
+        yield from filter_objects(list(self._attributes.values()), **kwargs)
 
     def get(self, **kwargs):
-        return get_object(list(self._attributes.values()), **kwargs)
+        return get_objects(list(self._attributes.values()), **kwargs)
 
     def add(self, name, **kwargs):
         attr = self.__call__(name)
@@ -89,7 +90,10 @@ class SiteAttributeManager:
 class NSoTAttributeManager:
     """Generate NSoT resource attribute objects"""
 
-    _sites_attributes = NSoTClient.resource.attributes.get()
+    @LazyAttribute
+    def _sites_attributes(cls):
+        "The NSoT attributes of all sites, fetched on first use"
+        return NSoTClient.resource.attributes.get()
 
     def __init__(self, model):
 
@@ -115,13 +119,35 @@ class NSoTAttributeManager:
         return self._sites_cache[site_name]
 
     def filter(self, **kwargs):
-        """Return a list of resource based on kwargs"""
-        yield from filter_object(self._get_all(), **kwargs)
+        """Return a list of resource based on kwargs, see `Query` for the
+        lookups"""
+        if kwargs:
+            query = Query(**kwargs)
+            yield from query.filter(self._candidates(query))
 
     def get(self, **kwargs):
         """Return a single `Device` based on kwargs, if kwargs is not provided it
         return all the objects"""
-        return get_object(self._get_all(), **kwargs)
+        if not kwargs:
+            return self._get_all()
+        query = Query(**kwargs)
+        return query.get(self._candidates(query))
+
+    def _candidates(self, query):
+        """Return the attributes that may match the query, the attributes is
+        key by site name and name"""
+        conditions = query.indexable(("site_name", "name"))
+        try:
+            sites = [self._attributes.get(s, {}) for s in conditions["site_name"]]
+        except (KeyError, TypeError):
+            sites = self._attributes.values()
+
+        if "name" not in conditions:
+            return [obj for v in sites for obj in v.values()]
+        try:
+            return [v[n] for v in sites for n in conditions["name"] if n in v]
+        except TypeError:
+            return [obj for v in sites for obj in v.values()]
 
     def _get_all(self):
         return [obj for k, v in self._attributes.items() for _, obj in v.items()]
@@ -175,12 +201,12 @@ class NSoTResourceManager:
 
     def filter(self, **kwargs):
         """Return a list of resource based on kwargs"""
-        yield from filter_object(self._get_all(), **kwargs)
+        yield from filter_objects(self._get_all(), **kwargs)
 
     def get(self, **kwargs):
         """Return a single `Device` based on kwargs, if kwargs is not provided it
         return all the objects"""
-        return get_object(self._get_all(), **kwargs)
+        return get_objects(self._get_all(), **kwargs)
 
     def _get_all(self):
         return [obj for k, v in self._objects.items() for _, obj in v.items()]
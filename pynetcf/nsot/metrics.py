@@ -0,0 +1,196 @@
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock, local
+
+from .retry import circuit_breaker, stats
+
+# upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+LABELS = ("resource", "method", "site", "phase")
+
+
+class Metrics:
+    """In-process metrics of the NSoT requests
+
+    Records the count, latency histogram, payload bytes and status of the
+    requests per resource, method, site and phase. The phase is the name of
+    the current stage of a run ex. loading, allocation or commit. The bytes
+    saved by the minimal PATCH payloads are recorded with `record_patch`.
+    The phase is per thread, so the requests of a thread are not labelled with
+    the phase of another thread.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._local = local()
+        self.reset()
+
+    def reset(self):
+        "Clear all the recorded metrics"
+        with self._lock:
+            self._counts = defaultdict(int)
+            self._buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+            self._latency = defaultdict(float)
+            self._request_bytes = defaultdict(int)
+            self._response_bytes = defaultdict(int)
+            self._patch_bytes_saved = defaultdict(int)
+
+    @property
+    def current_phase(self):
+        return getattr(self._local, "phase", None)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Label the requests within the context with the phase name
+        :param name (str): name of the phase ex. loading
+        """
+        previous = self.current_phase
+        self._local.phase = name
+        try:
+            yield self
+        finally:
+            self._local.phase = previous
+
+    def in_phase(self, func, name=None):
+        """
+        Return the function that runs in the phase, for the functions run in a
+        worker thread since the phase is per thread
+        :param func: the function
+        :param name (str): name of the phase, default to the current phase of
+            the calling thread
+        """
+        if name is None:
+            name = self.current_phase
+
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def record(
+        self,
+        resource,
+        method,
+        site_id,
+        status,
+        latency,
+        request_bytes=0,
+        response_bytes=0,
+    ):
+        """
+        Record a single NSoT request
+        :param resource (str): name of the resource ex. networks
+        :param method (str): the HTTP method
+        :param site_id (int): the site of the request or `None`
+        :param status (str): `ok` or the HTTP status of the failed request
+        :param latency (float): seconds of the request
+        :param request_bytes (int): size of the request payload
+        :param response_bytes (int): size of the response
+        """
+        key = resource or "", method, str(site_id or ""), self.current_phase or ""
+
+        with self._lock:
+            self._counts[key + (str(status),)] += 1
+            self._buckets[key][bisect_left(LATENCY_BUCKETS, latency)] += 1
+            self._latency[key] += latency
+            self._request_bytes[key] += request_bytes
+            self._response_bytes[key] += response_bytes
+
+    def record_patch(self, resource, site_id, full_bytes, patch_bytes):
+        """
+        Record the bytes saved by a PATCH payload of the changed fields only
+        :param resource (str): name of the resource ex. networks
+        :param site_id (int): the site of the request
+        :param full_bytes (int): size of the payload of the full object
+        :param patch_bytes (int): size of the sent payload
+        """
+        key = resource or "", "PATCH", str(site_id or ""), self.current_phase or ""
+        with self._lock:
+            self._patch_bytes_saved[key] += full_bytes - patch_bytes
+
+    def get(self):
+        """Return the metrics as list of dict per resource, method, site and
+        phase"""
+        with self._lock:
+            result = []
+            for key, buckets in self._buckets.items():
+                labels = dict(zip(LABELS, key))
+                result.append(
+                    {
+                        **labels,
+                        "count": sum(buckets),
+                        "latency": self._latency[key],
+                        "request_bytes": self._request_bytes[key],
+                        "response_bytes": self._response_bytes[key],
+                        "patch_bytes_saved": self._patch_bytes_saved.get(key, 0),
+                        "status": {
+                            k[-1]: v
+                            for k, v in self._counts.items()
+                            if k[:-1] == key
+                        },
+                    }
+                )
+        return result
+
+    def to_prometheus(self):
+        "Return the metrics in Prometheus text format"
+
+        def labels(key, **extra):
+            pairs = [*zip(LABELS, key), *extra.items()]
+            return ",".join(f'{k}="{v}"' for k, v in pairs)
+
+        lines = []
+
+        with self._lock:
+            lines.append("# HELP pynetcf_nsot_requests_total NSoT requests")
+            lines.append("# TYPE pynetcf_nsot_requests_total counter")
+            for key, count in sorted(self._counts.items()):
+                status = labels(key[:-1], status=key[-1])
+                lines.append(f"pynetcf_nsot_requests_total{{{status}}} {count}")
+
+            name = "pynetcf_nsot_request_duration_seconds"
+            lines.append(f"# HELP {name} NSoT request latency")
+            lines.append(f"# TYPE {name} histogram")
+            for key, buckets in sorted(self._buckets.items()):
+                total = 0
+                for le, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                    total += count
+                    lines.append(f"{name}_bucket{{{labels(key, le=le)}}} {total}")
+                lines.append(f"{name}_sum{{{labels(key)}}} {self._latency[key]}")
+                lines.append(f"{name}_count{{{labels(key)}}} {total}")
+
+            for name, values in (
+                ("pynetcf_nsot_request_bytes_total", self._request_bytes),
+                ("pynetcf_nsot_response_bytes_total", self._response_bytes),
+                ("pynetcf_nsot_patch_bytes_saved_total", self._patch_bytes_saved),
+            ):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{name}{{{labels(key)}}} {value}")
+
+        for stat, value in sorted(stats.items()):
+            lines.append(f"# TYPE pynetcf_nsot_{stat}_total counter")
+            lines.append(f"pynetcf_nsot_{stat}_total {value}")
+
+        lines.append("# TYPE pynetcf_nsot_circuit_open gauge")
+        lines.append(
+            f"pynetcf_nsot_circuit_open {int(circuit_breaker.state != 'closed')}"
+        )
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the metrics in Prometheus text format, the file is replaced
+        atomically for the node exporter textfile collector"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
@@ -1,39 +1,146 @@
 from collections import defaultdict
-from random import shuffle
-
 # from itertools import groupby
 
-from netaddr import IPNetwork, IPSet
-from sortedcontainers import SortedList
+from netaddr import IPAddress, IPNetwork
+from sortedcontainers import SortedKeyList
 
+import pynetcf.constants as C
+from pynetcf.utils.bitmap import Bitmap, SparseBitmap
+from pynetcf.utils.buddy import BuddyAllocator
 from pynetcf.utils.logger import get_logger
+from pynetcf.utils.permutation import Permutation
+from pynetcf.utils.radix import RadixTree
 from pynetcf.nsot.resource import Resource, ResourceManager
 
 logger = get_logger(__name__)
 
 
-class Manager(ResourceManager):
-    def assign_parent(self, obj):
-        parents = self._parents.get(obj.ip_group)
-        if parents:
-            for parent in reversed(parents):
-                if obj.prefix_length > parent.prefix_length:
-                    if obj.is_subnet_of(parent):
-                        return parent
-        else:
-            if obj.is_ip:
-                raise ValueError(f"IPAddress {obj} needs a parent network")
+def sort_key(network):
+    "Return the sort key of the network, the key function of the sorted networks"
+    return network.sort_key()
 
-    def add_to_parents(self, obj):
+
+def ip_width(ipnet):
+    "Return the number of bits of the IP addresses of the `IPNetwork`"
+    return 32 if ipnet.version == 4 else 128
+
+
+class Manager(ResourceManager):
+    def _parents_tree(self, obj, create=False):
+        """Return the radix tree of the parents networks of the site and the IP
+        version of the network
+        :param create (bool): create the tree if not exists
+        """
         if getattr(self, "_parents", None) is None:
             self._parents = {}
 
-        group = obj.ip_group
+        ipnet = obj._ipnet
+        key = obj.site_id, ipnet.version
+        tree = self._parents.get(key)
+        if tree is None and create:
+            tree = self._parents[key] = RadixTree(ip_width(ipnet))
+        return tree
+
+    def assign_parent(self, obj):
+        "Return the longest prefix parent network of the network"
+        ipnet = obj._ipnet
+        tree = self._parents_tree(obj)
+        parent = tree.get_parent(ipnet.first, ipnet.prefixlen) if tree else None
+
+        # a longer prefix parent network may not be created yet
+        supernet = self._raw_supernet(obj, parent.prefix_length if parent else -1)
+        if supernet is not None:
+            parent = supernet
+
+        if parent is None and obj.is_ip:
+            raise ValueError(f"IPAddress {obj} needs a parent network")
+        return parent
+
+    def _raw_supernet(self, obj, min_prefixlen):
+        """Return the longest supernet of the network that is still a raw record,
+        created from the raw record. Only the prefix lengths longer than
+        min_prefixlen that have raw networks in the site are looked up"""
+        store = self._objects
+        ipnet = obj._ipnet
+        width = ip_width(ipnet)
+        version = str(ipnet.version)
+
+        for prefixlen in range(ipnet.prefixlen - 1, min_prefixlen, -1):
+            if not store.raw_count("prefixlen", (obj.site_id, version, prefixlen)):
+                continue
+
+            host_bits = width - prefixlen
+            value = ipnet.first >> host_bits << host_bits
+            key = f"{IPAddress(value, ipnet.version)}/{prefixlen}", obj.site_id
+            if store.is_raw(key):
+                return store.hydrate(key)
+        return None
+
+    def add_to_parents(self, obj):
+        self._parents_tree(obj, create=True).add(
+            obj._ipnet.first, obj._ipnet.prefixlen, obj
+        )
 
-        if self._parents.get(group) is None:
-            self._parents[group] = SortedList([], key=lambda x: x.sort_key())
+    def remove_from_parents(self, obj):
+        tree = self._parents_tree(obj)
+        if tree is not None:
+            tree.discard(obj._ipnet.first, obj._ipnet.prefixlen, obj)
 
-        self._parents[group].add(obj)
+    def reparent_raw(self, parent_key, parent_cidr, parent_id=None, ipnet=None):
+        """
+        Replace the parent of the raw records of the subnets of the parent
+        network, NSoT moves the subnets of a created or deleted network without
+        a change
+        :param parent_key (tuple): key of the parent network of the raw records
+        :param parent_cidr (str): CIDR of the new parent network, `None` is no
+            parent
+        :param parent_id (int): NSoT ID of the new parent network
+        :param ipnet (IPNetwork): move only the subnets within this network
+        """
+        parent = {"parent": parent_cidr, "parent_id": parent_id}
+
+        store = self._objects
+        for nsot_obj in store.raw_records("parent", parent_key):
+            if ipnet is not None:
+                subnet = IPNetwork(nsot_obj["cidr"])
+                if subnet.prefixlen <= ipnet.prefixlen or subnet not in ipnet:
+                    continue
+            store.discard_raw(nsot_obj["id"])
+            store.add_raw({**nsot_obj, **parent})
+
+    def apply_change(self, event, nsot_obj):
+        """Apply a NSoT change to the cache objects, the subnets within a created
+        network are moved under it and the subnets of a deleted network are moved
+        to its parent like NSoT"""
+        obj = super().apply_change(event, nsot_obj)
+        if nsot_obj.get("is_ip"):
+            return obj
+
+        store = self._objects
+        key = self._model._nsot_key(nsot_obj)
+        parent_key = nsot_obj.get("parent"), key[-1]
+
+        if event == "Create":
+            ipnet = IPNetwork(nsot_obj["cidr"])
+            self.reparent_raw(parent_key, nsot_obj["cidr"], nsot_obj["id"], ipnet)
+
+            # the created subnets of the parent are moved once this is created
+            if parent_key[0] is None:
+                roots = [
+                    n
+                    for n in store.hydrated()
+                    if n.site_id == key[-1] and n.parent is None and n._key != key
+                ]
+                if any(n._ipnet in ipnet for n in roots):
+                    obj = obj or store.hydrate(key)
+                    obj._adopt_subnets(roots)
+            elif obj is None and store.hydrated_get(parent_key) is not None:
+                obj = store.hydrate(key)
+
+        elif event == "Delete" and obj is None:
+            self.reparent_raw(key, nsot_obj.get("parent"), nsot_obj.get("parent_id"))
+
+        return obj
 
     def get_hosts_generator(self, obj_key, args):
 
@@ -63,11 +170,22 @@ class Manager(ResourceManager):
 class Network(Resource):
     """A single Network"""
 
+    __slots__ = ()
+
     # instance arguments
     _args = ("cidr", "site_id")
-    # sort the existing NSoT resource objects before creating an instance
-    # use in class customisation in parent __init_subclass__
-    _sort_objects_by = "prefix_length"
+
+    # instance attributes
+    _fields = (
+        "_ipnet",
+        "_sorted_subnets",
+        "_hosts",
+        "_allocator",
+        "prefix_length",
+        "is_ip",
+        "is_usable",
+        "parent",
+    )
 
     manager = Manager(parents=None, hosts_generators_cache=None)
 
@@ -84,19 +202,31 @@ class Network(Resource):
         if ipnet.prefixlen == 32:
             attrs.is_ip = True
 
+        # a host address never has subnets, avoid a sorted list per host
+        if attrs.get("is_ip"):
+            sorted_subnets = ()
+        else:
+            sorted_subnets = SortedKeyList(key=sort_key)
+
         attrs.update(
             {
                 "_ipnet": ipnet,
-                "_sorted_subnets": SortedList([], key=lambda x: x.sort_key()),
+                "_sorted_subnets": sorted_subnets,
                 "cidr": cidr,
                 "prefix_length": ipnet.prefixlen,
-                "ip_group": ipnet.ip.words[:-2],
-                "value": ipnet.value,
-                "size": ipnet.size,
-                "sort_key": ipnet.sort_key,
             }
         )
 
+    @classmethod
+    def _raw_indexes(cls, key, nsot_obj):
+        """Return the indexes of the raw record, the subnets of a network and
+        the parents networks are created from the raw records on demand"""
+        site_id = nsot_obj.get("site_id")
+        yield "parent", (nsot_obj.get("parent"), site_id)
+        if not nsot_obj.get("is_ip"):
+            version = str(nsot_obj.get("ip_version"))
+            yield "prefixlen", (site_id, version, nsot_obj.get("prefix_length"))
+
     @classmethod
     def _pre_init(cls, obj):
         """Manipulate specific resource instance attributes before returning"""
@@ -104,24 +234,220 @@ class Network(Resource):
         if not obj.is_ip:
             cls.manager.add_to_parents(obj)
 
-        if obj.parent:
-            parent_key = obj.parent, obj.site_id
-            parent = cls.manager._objects.get(parent_key) or cls(*parent_key)
+        obj._link_parent(obj.parent)
+
+    @property
+    def value(self):
+        "The integer value of the IP address"
+        return self._attrs._ipnet.value
+
+    @property
+    def size(self):
+        "The number of IP addresses of the network"
+        return self._attrs._ipnet.size
+
+    @property
+    def ip_group(self):
+        "The first two words of the IP address"
+        return self._attrs._ipnet.ip.words[:-2]
+
+    def sort_key(self):
+        "Return the sort key of the network, see `IPNetwork.sort_key`"
+        return self._attrs._ipnet.sort_key()
+
+    def _link_parent(self, parent_cidr):
+        """Assign the parent network and add this network to its subnets
+        :param parent_cidr (str): CIDR of the parent network, if `None` the parent
+            of a new network is the longest prefix parent networks. The parent of
+            an existing network is always from NSoT server, so the NSoT objects
+            can be loaded in any order
+        """
+        if parent_cidr:
+            parent_key = parent_cidr, self.site_id
+            parent = self.manager._objects.get(parent_key) or Network(*parent_key)
+        elif self._nsot_obj:
+            parent = None
         else:
-            parent = cls.manager.assign_parent(obj)
+            parent = self.manager.assign_parent(self)
+
+        self._set_parent(parent)
+        if not self.is_ip:
+            self._adopt_subnets()
+
+    def _set_parent(self, parent):
+        "Assign the parent network and add this network to its subnets"
+        self._attrs.prefix_length = self._ipnet.prefixlen
 
         try:
-            prefix_length = obj.prefix_length
+            prefix_length = self.prefix_length
 
-            parent._sorted_subnets.add(obj)
-            if obj.is_ip:
-                host_num = obj.value - parent.value
-                obj._attrs.is_usable = host_num > 0 and host_num < parent.size
+            parent._sorted_subnets.add(self)
+            if self.is_ip:
+                host_num = self.value - parent.value
+                self._attrs.is_usable = host_num > 0 and host_num < parent.size
                 prefix_length = parent.prefix_length
         except AttributeError:
             pass
 
-        obj._attrs.update({"parent": parent, "prefix_length": prefix_length})
+        self._attrs.update({"parent": parent, "prefix_length": prefix_length})
+        if self.is_ip:
+            self._update_parent_hosts()
+        else:
+            self._update_parent_subnets(used=True)
+
+    def _adopt_subnets(self, subnets=None):
+        """
+        Move the subnets within this network under this network, NSoT moves
+        them without a change when a network is created between
+        :param subnets (list): the networks to move if within this network,
+            default to the subnets of the parent network
+        """
+        ipnet = self._ipnet
+        if subnets is None:
+            parent = self._attrs.get("parent")
+            if parent is None:
+                return
+            subnets = parent._sorted_subnets.irange_key(
+                (ipnet.version, ipnet.first),
+                (ipnet.version, ipnet.last + 1),
+                inclusive=(True, False),
+            )
+
+        subnets = [
+            s
+            for s in subnets
+            if s._ipnet.prefixlen > ipnet.prefixlen and s._ipnet in ipnet
+        ]
+        for subnet in subnets:
+            subnet._unlink_parent()
+            subnet._set_parent(self)
+
+        # the moved subnets are freed in the parent network, allocate this again
+        if subnets:
+            self._update_parent_subnets(used=True)
+
+    def _hydrate_subnets(self):
+        "Create the subnets of this network that are still raw records"
+        if not self.is_ip:
+            self.manager._objects.hydrate_index("parent", self._key)
+
+    def _unlink_parent(self):
+        "Remove this network from the subnets of the parent network"
+        parent = self._attrs.get("parent")
+        if parent:
+            parent._sorted_subnets.discard(self)
+            if self.is_ip:
+                self._update_parent_hosts(used=False)
+            else:
+                self._update_parent_subnets(used=False)
+        self._attrs.parent = None
+
+    def _hosts_bitmap(self):
+        """Return the allocation bitmap of the host addresses of this network,
+        built once from the hosts and updated as the hosts are created, orphaned
+        or removed"""
+        bitmap = self._attrs.get("_hosts")
+        if bitmap is not None:
+            # the hosts added by sync are raw records, mark them once created
+            self._hydrate_subnets()
+        else:
+            size = self.size
+            if size > C.HOSTS_BITMAP_MAX_SIZE:
+                bitmap = SparseBitmap(size)
+            else:
+                bitmap = Bitmap(size)
+            # the network and broadcast addresses are never allocated
+            bitmap.add(0)
+            bitmap.add(size - 1)
+            value = self.value
+            for host in self.hosts():
+                bitmap.add(host.value - value)
+            self._attrs._hosts = bitmap
+        return bitmap
+
+    def _update_parent_hosts(self, used=None):
+        """Mark this host address as used or free in the allocation bitmap of the
+        parent network, an orphaned host is free
+        :param used (bool): `None` is used unless the state is orphaned
+        """
+        parent = self._attrs.get("parent")
+        bitmap = parent._attrs.get("_hosts") if parent else None
+        if bitmap is None:
+            return
+
+        if used is None:
+            used = self.state != "orphaned"
+        host_num = self.value - parent.value
+        if 0 < host_num < len(bitmap) - 1:
+            if used:
+                bitmap.add(host_num)
+            else:
+                bitmap.discard(host_num)
+
+    def _subnets_allocator(self):
+        """Return the buddy allocator of the subnets of this network, built once
+        from the subnets and updated as the subnets are created or removed"""
+        allocator = self._attrs.get("_allocator")
+        if allocator is not None:
+            # the subnets added by sync are raw records, allocate them once created
+            self._hydrate_subnets()
+        else:
+            ipnet = self._ipnet
+            allocator = BuddyAllocator(ipnet.first, ipnet.prefixlen, ip_width(ipnet))
+            for subnet in self.subnets():
+                allocator.allocate(subnet._ipnet.first, subnet._ipnet.prefixlen)
+            self._attrs._allocator = allocator
+        return allocator
+
+    def _update_parent_subnets(self, used):
+        """Mark this network as allocated or free in the subnets allocator of the
+        parent network
+        :param used (bool): `True` is allocated
+        """
+        parent = self._attrs.get("parent")
+        allocator = parent._attrs.get("_allocator") if parent else None
+        if allocator is None:
+            return
+
+        ipnet = self._ipnet
+        if used:
+            allocator.allocate(ipnet.first, ipnet.prefixlen)
+        else:
+            allocator.free(ipnet.first, ipnet.prefixlen)
+
+    def _set_state(self, value):
+        "Set the state, an orphaned host is free in the parent network"
+        self._payload["state"] = value
+        if self.is_ip:
+            self._update_parent_hosts()
+
+    def _sync(self, old_nsot_obj):
+        "Reparent the network if the parent has changed in the NSoT server"
+        parent_cidr = self._nsot_obj.get("parent")
+        parent = self._attrs.get("parent")
+        if parent_cidr != getattr(parent, "cidr", None):
+            self._unlink_parent()
+            self._link_parent(parent_cidr)
+        elif self.is_ip:
+            self._update_parent_hosts()
+
+    def _unlink(self):
+        """Remove the network from the parent and the parents networks, the
+        subnets are moved to the parent network like NSoT"""
+        parent = self._attrs.get("parent")
+        self._unlink_parent()
+        if self.is_ip:
+            return
+
+        self.manager.remove_from_parents(self)
+        for subnet in list(self._sorted_subnets):
+            subnet._unlink_parent()
+            subnet._set_parent(parent)
+        if parent is None:
+            self.manager.reparent_raw(self._key, None)
+        else:
+            parent_id = parent._nsot_obj.get("id")
+            self.manager.reparent_raw(self._key, parent.cidr, parent_id)
 
     @property
     def assignment(self):
@@ -135,8 +461,12 @@ class Network(Resource):
     def assignment(self, value):
         self.add_attributes(assignment=value)
 
-    def update_post(self):
-        """POST or UPDATE interface in NSoT server"""
+    def _dependencies(self):
+        "Return the objects that must exists in NSoT server before this network"
+        return [self.parent] if self.parent else []
+
+    def _pre_update(self):
+        """Reserve the parent network of the IP address before POST or UPDATE"""
         if self.is_ip:
             parent = self.parent
             parent.state = "reserved"
@@ -146,8 +476,6 @@ class Network(Resource):
                 # the network has already assigned hosts
                 parent.update_post()
 
-        super().update_post()
-
     def delete(self, force=False):
         """
         DELETE interface in NSoT server
@@ -155,7 +483,8 @@ class Network(Resource):
         """
         if force:
             # if this network is a parent delete all its subnets
-            for subnet in self._sorted_subnets:
+            self._hydrate_subnets()
+            for subnet in list(self._sorted_subnets):
                 subnet.delete(force=True)
 
         super().delete()
@@ -164,10 +493,15 @@ class Network(Resource):
         """Return `True` if this network is subnet of parent
         :param parent (Network): the Network object
         """
-        return self.value - parent.value < parent.size
+        return 0 <= self.value - parent.value < parent.size
+
+    def free_hosts_count(self):
+        "Return the number of host addresses of this network not yet allocated"
+        return self._hosts_bitmap().free
 
     def hosts(self):
         "Generator that yield the IP host address in this network"
+        self._hydrate_subnets()
         for subnet in self._sorted_subnets:
             if subnet.is_ip and subnet.state != "orphaned":
                 yield subnet
@@ -177,23 +511,30 @@ class Network(Resource):
         if self.state == "reserved":
             return None
 
+        self._hydrate_subnets()
         for subnet in self._sorted_subnets:
             if not subnet.is_ip:
                 if all:
                     yield from subnet.subnets(all=True)
                 yield subnet
 
-    def subnets_generator(self, prefixlen, random=False, reverse=False, strict=True):
+    def subnets_generator(
+        self, prefixlen, random=False, reverse=False, strict=True, seed=None
+    ):
         """
-        A subnets generator
+        A subnets generator, the free subnets are from the buddy allocator of
+        this network so the generators of the same network never yield the same
+        subnet
         :param prefixlen (int): the prefixlen of subnets to create
-        :param random (bool): `True` will shuffle the order of subnets.
+        :param random (bool): `True` will yield the subnets in a pseudo-random
+            permutation of the subnets of this network, the allocated are skipped
         :param reverse (bool): `True` will reverse the order of subnets
         :param strict (bool): 'True' by default will raise to error if
             the state of this network is `reserved` meaning that there is
             already have assigned hosts. Same with if this network overlaps
             with parent network which state is `reserved`. `False` will create
             a subnet of this network without error, and will reparent the subnets.
+        :param seed: the seed of the random order, `None` is random
         :yield: `Network`
         """
 
@@ -221,52 +562,39 @@ class Network(Resource):
             yield self
             raise None
 
-        global_ipset = IPSet(self._ipnet) - IPSet(
-            [s._ipnet for s in self.subnets(all=True)]
-        )
+        ipnet = self._ipnet
+        if self.state == "reserved":
+            # not strict, the subnets are reparented so the whole network is free
+            reserved = BuddyAllocator(ipnet.first, ipnet.prefixlen, ip_width(ipnet))
 
-        def to_network(subnets, is_shuffle=False):
-            if is_shuffle:
-                shuffle(subnets)
+            def get_allocator():
+                return reserved
 
-            for subnet in subnets:
-                yield Network(str(subnet), self.site_id)
+        else:
+            # the allocator is taken before each subnet for the subnets added by sync
+            get_allocator = self._subnets_allocator
 
-        def unique_subnets():
-            for cidr in global_ipset.iter_cidrs():
-                yield from cidr.subnet(prefixlen)
+        def to_network(value):
+            subnet = Network(
+                f"{IPAddress(value, ipnet.version)}/{prefixlen}", self.site_id
+            )
+            get_allocator().allocate(value, prefixlen)
+            return subnet
 
-        def _subnets_generator(ipset):
+        def _subnets_generator():
             if random:
-                try:
-                    subnets = unique_subnets()
-                    while True:
-                        subnet_chunk = [next(subnets) for _ in range(1024)]
-                        yield from to_network(subnet_chunk, True)
-                        ipset = ipset - IPSet(subnet_chunk)
-                        subnet_chunk.clear()
-                except StopIteration:
-                    yield from to_network(
-                        [s for c in ipset.iter_cidrs() for s in c.subnet(prefixlen)],
-                        True,
-                    )
-            elif reverse:
-                cidrs = []
-                for cidr in ipset.iter_cidrs():
-                    prefix_diff = prefixlen - cidr.prefixlen
-                    if prefix_diff > 11:
-                        new_prefix = int(prefixlen - (prefix_diff / 2))
-                        for subnet in cidr.subnet(new_prefix):
-                            cidrs.append(subnet)
-                    else:
-                        cidrs.append(cidr)
-                for cidr in reversed(cidrs):
-                    subnets = list(cidr.subnet(prefixlen))
-                    yield from to_network(reversed(subnets))
+                size = 1 << (ip_width(ipnet) - prefixlen)
+                for index in Permutation(1 << (prefixlen - ipnet.prefixlen), seed):
+                    value = ipnet.first + index * size
+                    if get_allocator().is_free(value, prefixlen):
+                        yield to_network(value)
             else:
-                yield from to_network(unique_subnets())
+                value = get_allocator().first(prefixlen, reverse)
+                while value is not None:
+                    yield to_network(value)
+                    value = get_allocator().first(prefixlen, reverse)
 
-        subnets = _subnets_generator(global_ipset)
+        subnets = _subnets_generator()
 
         try:
             while True:
@@ -275,67 +603,57 @@ class Network(Resource):
             e.args = (f"Network {self} run out of subnets",)
             raise
 
-    def hosts_generator(self, random=False, reverse=False):
+    def hosts_generator(self, random=False, reverse=False, seed=None):
         """
-        A hosts generator
+        A hosts generator, the free hosts are from the allocation bitmap of this
+        network so the generators of the same network never yield the same host
 
-        :param random (bool): `True` will shuffle the order of hosts addresses.
+        :param random (bool): `True` will yield the hosts addresses in a
+            pseudo-random permutation of this network, the used are skipped
         :param reverse (bool): `True` will reverse the order of hosts addresses
+        :param seed: the seed of the random order, `None` is random
         :yield: `Network`
         """
 
         if self.is_ip:
             raise TypeError(f"Network {self} is a host")
 
-        _ipnet = self._ipnet
-        _prefixlen = self.prefix_length
-
-        existing_hosts = IPSet([s._ipnet for s in self.hosts()])
-        existing_hosts.update([_ipnet.network, _ipnet.broadcast])
+        bitmap = self._hosts_bitmap()
+        value = self.value
+        version = self._ipnet.version
 
-        global_ipset = IPSet(_ipnet) - existing_hosts
-
-        def to_network(hosts, is_shuffle=False):
-            if is_shuffle:
-                shuffle(hosts)
-
-            for host in hosts:
+        def to_network(host_nums):
+            for host_num in host_nums:
+                host = IPAddress(value + host_num, version)
                 yield Network(f"{host}/32", self.site_id)
 
-        def unique_hosts():
-            for cidr in global_ipset.iter_cidrs():
-                for host in cidr:
-                    yield host
-
-        def _hosts_generator(ipset):
+        # the bitmap is taken before each host for the hosts added by sync
+        def free_hosts():
+            host_num = self._hosts_bitmap().next_free()
+            while host_num != -1:
+                yield host_num
+                host_num = self._hosts_bitmap().next_free(host_num + 1)
+
+        def reversed_free_hosts():
+            host_num = self._hosts_bitmap().prev_free()
+            while host_num != -1:
+                yield host_num
+                host_num = self._hosts_bitmap().prev_free(host_num)
+
+        def random_free_hosts():
+            for host_num in Permutation(len(bitmap), seed):
+                if host_num not in self._hosts_bitmap():
+                    yield host_num
+
+        def _hosts_generator():
             if random:
-                try:
-                    hosts = unique_hosts()
-                    while True:
-                        hosts_chunk = [next(hosts) for _ in range(1024)]
-                        yield from to_network(hosts_chunk, True)
-                        ipset = ipset - IPSet(hosts_chunk)
-                        hosts_chunk.clear()
-                except StopIteration:
-                    yield from to_network(
-                        [h for c in ipset.iter_cidrs() for h in c], True
-                    )
+                yield from to_network(random_free_hosts())
             elif reverse:
-                cidrs = []
-                for cidr in ipset.iter_cidrs():
-                    prefix_diff = _prefixlen - cidr.prefixlen
-                    if prefix_diff > 11:
-                        new_prefix = int(_prefixlen - (prefix_diff / 2))
-                        for subnet in cidr.subnet(new_prefix):
-                            cidrs.append(subnet)
-                    else:
-                        cidrs.append(cidr)
-                for cidr in reversed(cidrs):
-                    yield from to_network(reversed(list(cidr)))
+                yield from to_network(reversed_free_hosts())
             else:
-                yield from to_network(unique_hosts())
+                yield from to_network(free_hosts())
 
-        ips = _hosts_generator(global_ipset)
+        ips = _hosts_generator()
 
         try:
             while True:
@@ -354,7 +672,9 @@ if __name__ == "__main__":
     for network in Network.manager.get():
 
         print("Network:", network, "\n")
-        pprint.pprint(network.__dict__, depth=4)
+        # the objects have slots, no __dict__
+        pprint.pprint(dict(network._attrs.items()), depth=4)
+        pprint.pprint(network._nsot_obj, depth=4)
 
         # try:
         #     subnets = network.subnets_generator(30)
@@ -0,0 +1,151 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pynetcf.constants as C
+from pynetcf.utils import chunks
+from pynetcf.utils.logger import get_logger
+from .metrics import metrics
+from .resource import Resource
+
+logger = get_logger(__name__)
+
+
+class CommitPlanner:
+    """Commit the pending changes of the resource objects in dependency order
+
+    The pending objects are grouped into waves, an object only depends on
+    objects of the previous waves ex. parent networks before IP addresses,
+    devices before interfaces and parent interfaces before sub interfaces.
+    The bulk requests of a wave are run concurrently in a worker pool.
+    """
+
+    def __init__(self, objects=None, max_workers=None, chunk_size=None):
+        """
+        :param objects (list): the objects to commit, default to all the
+            pending objects of the loaded resource models
+        :param max_workers (int): number of worker threads, default to
+            `NSOT_COMMIT_WORKERS`
+        :param chunk_size (int): number of objects per request, default to
+            `NSOT_BULK_CHUNK_SIZE`
+        """
+        self._objects = objects
+        self._max_workers = max_workers or C.NSOT_COMMIT_WORKERS
+        self._chunk_size = chunk_size or C.NSOT_BULK_CHUNK_SIZE
+
+    def pending(self):
+        """Return the objects that are new or have changes, only the dirty
+        objects of the resource models are compared"""
+        if self._objects is not None:
+            objects = self._objects
+        else:
+            objects = [
+                obj
+                for model in Resource._models.values()
+                if model.manager._loaded
+                for obj in model.manager._objects.dirty()
+            ]
+        return [obj for obj in objects if obj.has_changes()]
+
+    def plan(self):
+        """
+        Return the waves of the pending objects, including the pending
+        dependencies of the objects
+        :raise ValueError: if the dependencies has a cycle
+        """
+        dependencies = {}
+        stack = self.pending()
+
+        while stack:
+            obj = stack.pop()
+            if obj in dependencies:
+                continue
+
+            get_dependencies = getattr(obj, "_dependencies", None)
+            deps = {
+                dep
+                for dep in (get_dependencies() if get_dependencies else [])
+                if dep.has_changes()
+            }
+            dependencies[obj] = deps
+            stack.extend(deps)
+
+        dependents = defaultdict(list)
+        for obj, deps in dependencies.items():
+            for dep in deps:
+                dependents[dep].append(obj)
+
+        remaining = {obj: len(deps) for obj, deps in dependencies.items()}
+        wave = [obj for obj, count in remaining.items() if count == 0]
+        waves = []
+
+        while wave:
+            waves.append(wave)
+            next_wave = []
+            for obj in wave:
+                del remaining[obj]
+                for dependent in dependents[obj]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_wave.append(dependent)
+            wave = next_wave
+
+        if remaining:
+            raise ValueError(f"Dependency cycle between objects {list(remaining)}")
+
+        return waves
+
+    def _run_wave(self, executor, wave):
+        "Commit a single wave, one task per model, site and chunk of objects"
+        groups = defaultdict(list)
+        for obj in wave:
+            groups[obj.__class__, obj.site_id, obj.exists()].append(obj)
+
+        futures = []
+        for (model, _, exists), objects in groups.items():
+            if exists:
+                commit = model.manager.bulk_update
+            else:
+                commit = model.manager.bulk_create
+            # the requests of the workers are in the phase of the commit
+            commit = metrics.in_phase(commit)
+            for chunk in chunks(objects, self._chunk_size):
+                futures.append(executor.submit(commit, chunk, self._chunk_size))
+
+        # wait for all the tasks of the wave and raise the first error
+        errors = [f.exception() for f in futures if f.exception()]
+        if errors:
+            raise errors[0]
+
+    def commit(self):
+        """
+        Commit the pending objects wave by wave. Preparing an object may change
+        its dependencies ex. an IP address reserves its parent network, so the
+        objects are planned again until nothing is pending
+        :return: number of waves commited
+        """
+        count = 0
+        with metrics.phase("commit"), ThreadPoolExecutor(
+            max_workers=self._max_workers
+        ) as executor:
+            while True:
+                waves = self.plan()
+                if not waves:
+                    break
+
+                pending = sum(len(wave) for wave in waves)
+                for wave in waves:
+                    logger.info(f"commit wave {count} of {len(wave)} objects")
+                    self._run_wave(executor, wave)
+                    count += 1
+
+                # stop if the commit has no progress
+                if len(self.pending()) >= pending:
+                    logger.warning(f"{pending} objects still have changes")
+                    break
+
+        return count
+
+
+def commit(objects=None, max_workers=None, chunk_size=None):
+    """Commit the pending changes of the resource objects, see `CommitPlanner`"""
+    return CommitPlanner(objects, max_workers, chunk_size).commit()
@@ -0,0 +1,112 @@
+import time
+from threading import Condition, Lock
+
+import pynetcf.constants as C
+
+
+class TokenBucket:
+    """Token bucket rate limiter
+
+    The bucket is filled with `rate` tokens per second up to `burst` tokens,
+    each request takes a token and waits if the bucket is empty.
+    """
+
+    def __init__(self, rate, burst=None):
+        self._rate = float(rate)
+        self._burst = float(burst or rate)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        "Take a token, block until a token is available"
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return None
+
+                wait = (1 - self._tokens) / self._rate
+
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """Additive increase, multiplicative decrease (AIMD) concurrency limit
+
+    The limit of concurrent requests increase by one for every limit number of
+    requests faster than the target latency, and is cut by the backoff
+    factor on a slow or failed request.
+    """
+
+    def __init__(self, initial=None, maximum=None, target_latency=None, backoff=0.5):
+        self._limit = float(initial or C.NSOT_ADAPTIVE_INITIAL)
+        self._maximum = maximum or C.NSOT_ADAPTIVE_MAXIMUM
+        self._target_latency = target_latency or C.NSOT_ADAPTIVE_LATENCY
+        self._backoff = backoff
+        self._in_flight = 0
+        self._condition = Condition()
+
+    @property
+    def limit(self):
+        "The current limit of concurrent requests"
+        return int(self._limit)
+
+    def acquire(self):
+        "Block until the number of concurrent requests is below the limit"
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency, failed=False):
+        """
+        Release the request and adjust the limit
+        :param latency (float): seconds of the request
+        :param failed (bool): `True` if the request failed
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if failed or latency > self._target_latency:
+                self._limit = max(1.0, self._limit * self._backoff)
+            else:
+                self._limit = min(self._maximum, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    "Holds the token buckets per site and method and the concurrency per site"
+
+    def __init__(self):
+        self._lock = Lock()
+        self._buckets = {}
+        self._concurrency = {}
+
+    def bucket(self, site_id, method):
+        """Return the token bucket of the site and HTTP method or `None` if the
+        method is not limited in `NSOT_RATE_LIMITS`"""
+        key = site_id, method
+        if key not in self._buckets:
+            with self._lock:
+                limit = C.NSOT_RATE_LIMITS.get(method)
+                self._buckets.setdefault(key, limit and TokenBucket(*limit))
+        return self._buckets[key]
+
+    def concurrency(self, site_id):
+        """Return the adaptive concurrency of the site or `None` if disabled in
+        `NSOT_ADAPTIVE_CONCURRENCY`"""
+        if not C.NSOT_ADAPTIVE_CONCURRENCY:
+            return None
+        if site_id not in self._concurrency:
+            with self._lock:
+                self._concurrency.setdefault(site_id, AdaptiveConcurrency())
+        return self._concurrency[site_id]
+
+
+limiter = RateLimiter()
@@ -1,9 +1,19 @@
+from collections import defaultdict
+
+import pynetcf.constants as C
 from pynetcf.nsot.client import NSoTClient, nsot_request
-from pynetcf.utils import get_objects, filter_objects, AttrDict
+from pynetcf.nsot.endpoint import Endpoint, payload_size
+from pynetcf.nsot.metrics import metrics
+from pynetcf.utils import chunks, make_slot_attrs
+from pynetcf.utils.query import Query
 from pynetcf.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# the list fields that NSoT replaces as a whole and compares as a set, the
+# order of the values is not a change
+UNORDERED_FIELDS = ("addresses",)
+
 
 class EndpointDescriptor:
     def __init__(self, resource_name):
@@ -14,8 +24,10 @@ class EndpointDescriptor:
         try:
             return self._endpoints[obj.site_id]
         except KeyError:
-            endpoint = getattr(
-                NSoTClient.resource.sites(obj.site_id), self._resource_name
+            endpoint = Endpoint(
+                getattr(NSoTClient.resource.sites(obj.site_id), self._resource_name),
+                obj.site_id,
+                self._resource_name,
             )
             self._endpoints[obj.site_id] = endpoint
             return endpoint
@@ -44,10 +56,13 @@ class NSoTObjectDescriptor:
             except KeyError:
                 return obj._nsot_obj.get(self._name, self._default_value)
 
-        try:
-            return obj._attrs[self._name]
-        except KeyError:
-            return obj._nsot_obj.get(self._name)
+        attrs = obj._attrs
+        if self._name in attrs._field_names:
+            try:
+                return getattr(attrs, self._name)
+            except AttributeError:
+                pass
+        return obj._nsot_obj.get(self._name)
 
     def __set__(self, obj, value):
         if self._read_only:
@@ -58,6 +73,7 @@ class NSoTObjectDescriptor:
             extra_set_method(value)
         else:
             obj._payload[self._name] = value
+        obj._mark_dirty()
 
     def __delete__(self, obj):
         if self._read_only:
@@ -68,11 +84,12 @@ class NSoTObjectDescriptor:
             obj._extra_method()
         else:
             obj._payload[self._name] = self._default
+        obj._mark_dirty()
 
 
 class ResourceAttributes:
 
-    default = ["site_id", "site_name", ("attributes", True, {})]
+    default = ["site_id", "site_name", ("attributes", False, {})]
 
     devices = ["id", "hostname"]
     interfaces = [
@@ -105,36 +122,618 @@ class ResourceAttributes:
         return attrs
 
 
+def _attribute_pairs(attributes):
+    "Return the set of the attribute name and value, a multi value is expanded"
+    pairs = set()
+    for name, value in attributes.items():
+        for v in value if isinstance(value, (list, tuple, set)) else (value,):
+            try:
+                pairs.add((name, v))
+            except TypeError:
+                pass
+    return pairs
+
+
+class ResourceStore:
+    """The objects of a resource model key by the resource key
+
+    The NSoT objects are kept as raw records and the model object is created
+    on first access of its key, so only the objects in use are instantiated.
+    The raw records are indexed by the `_raw_indexes` of the model to create
+    the related objects on demand ex. the subnets of a network.
+
+    The objects and the raw records are also indexed by NSoT ID and by each
+    field of the resource arguments for `lookup`. The index of a field is
+    built on first lookup of the field and then kept up to date. The NSoT
+    attribute values are in an inverted index per site.
+
+    The keys of the new and changed objects are tracked as dirty, so the
+    commit only compares and sends the dirty objects.
+    """
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._hydrated = {}
+        self._raw = {}
+        self._raw_index = defaultdict(dict)
+        self._ids = {}
+        self._field_index = {}
+        self._attribute_index = defaultdict(dict)
+        self._dirty = {}
+
+    def _index_keys(self, key, nsot_obj):
+        raw_indexes = getattr(self._manager._model, "_raw_indexes", None)
+        return raw_indexes(key, nsot_obj) if raw_indexes else ()
+
+    def _add_key(self, key):
+        "Add the key to the built indexes of the fields"
+        for position, index in self._field_index.values():
+            index.setdefault(key[position], {})[key] = None
+
+    def _remove_key(self, key):
+        "Remove the key from the built indexes of the fields"
+        for position, index in self._field_index.values():
+            keys = index.get(key[position])
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del index[key[position]]
+
+    def _update_id(self, key, old_nsot_obj, nsot_obj):
+        "Update the NSoT ID index when the NSoT object of an object is replaced"
+        old_id = old_nsot_obj.get("id") if old_nsot_obj else None
+        new_id = nsot_obj.get("id") if nsot_obj else None
+        if old_id == new_id:
+            return
+
+        if old_id is not None and self._ids.get(old_id) == key:
+            del self._ids[old_id]
+        if new_id is not None:
+            self._ids[new_id] = key
+
+    def index_attributes(self, key, old_attributes, attributes):
+        """
+        Update the attribute index of the resource key with the changed
+        attributes
+        :param key (tuple): the resource key, the site ID is the last item
+        :param old_attributes (dict): the indexed attributes
+        :param attributes (dict): the new attributes
+        """
+        old_pairs = _attribute_pairs(old_attributes)
+        pairs = _attribute_pairs(attributes)
+        if old_pairs == pairs:
+            return
+
+        names = self._attribute_index[key[-1]]
+        for name, value in old_pairs - pairs:
+            keys = names.get(name, {}).get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del names[name][value]
+
+        for name, value in pairs - old_pairs:
+            names.setdefault(name, {}).setdefault(value, {})[key] = None
+
+    def attribute_keys(self, name, values=None, prefix=None, site_ids=None):
+        """
+        Return the resource keys of the attribute values from the index
+        :param name (str): name of the attribute
+        :param values (list): the attribute values to look up
+        :param prefix (str): the prefix of the attribute values to look up
+        :param site_ids (list): the sites to look up, default to all sites
+        :return: dict of the resource keys, all the keys of the attribute if
+            no values or prefix is given
+        """
+        keys = {}
+        for site_id, names in self._attribute_index.items():
+            if site_ids is not None and site_id not in site_ids:
+                continue
+
+            index = names.get(name, {})
+            if values is not None:
+                for value in values:
+                    keys.update(index.get(value, ()))
+            else:
+                for value, value_keys in index.items():
+                    if prefix is None or str(value).startswith(prefix):
+                        keys.update(value_keys)
+        return keys
+
+    def add_raw(self, nsot_obj):
+        """
+        Add the NSoT object as a raw record, the object is refreshed instead
+        if already created
+        :param nsot_obj (dict): the NSoT resource object
+        """
+        key = self._manager._model._nsot_key(nsot_obj)
+
+        obj = self._hydrated.get(key)
+        if obj is not None:
+            # the object was created before its NSoT object is loaded
+            if not obj._nsot_obj:
+                obj._refresh(nsot_obj)
+            return
+
+        self._raw[key] = nsot_obj
+        self._ids[nsot_obj["id"]] = key
+        self._add_key(key)
+        self.index_attributes(key, {}, nsot_obj.get("attributes", {}))
+        for name, index_key in self._index_keys(key, nsot_obj):
+            self._raw_index[name].setdefault(index_key, {})[key] = None
+
+    def _pop_raw(self, key):
+        "Remove the raw record of the key from the raw records and the indexes"
+        nsot_obj = self._raw.pop(key, None)
+        if nsot_obj is None:
+            return None
+
+        for name, index_key in self._index_keys(key, nsot_obj):
+            keys = self._raw_index[name].get(index_key)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._raw_index[name][index_key]
+        return nsot_obj
+
+    def discard_raw(self, id):
+        """
+        Remove the raw record of the NSoT ID if the object is not created yet
+        :param id (int): the NSoT ID of the object
+        :return: `True` if the raw record is removed
+        """
+        key = self._ids.get(id)
+        nsot_obj = self._pop_raw(key) if key is not None else None
+        if nsot_obj is None:
+            return False
+
+        del self._ids[id]
+        if key not in self._hydrated:
+            self._remove_key(key)
+            self.index_attributes(key, nsot_obj.get("attributes", {}), {})
+        return True
+
+    def hydrate(self, key):
+        "Return the object of the key, created from the raw record on first access"
+        try:
+            return self._hydrated[key]
+        except KeyError:
+            pass
+
+        nsot_obj = self._pop_raw(key)
+        if nsot_obj is None:
+            return None
+        return self._manager._model(*key, nsot_obj=nsot_obj)
+
+    def hydrate_index(self, name, index_key):
+        """
+        Create the objects of the raw records in the index
+        :param name (str): name of the index ex. parent
+        :param index_key (tuple): the key in the index ex. the parent key
+        """
+        keys = self._raw_index[name].pop(index_key, None)
+        for key in keys or ():
+            self.hydrate(key)
+
+    def raw_records(self, name, index_key):
+        """Return the raw records in the index, the NSoT objects of the objects
+        not created yet ex. the raw subnets of a network"""
+        keys = self._raw_index[name].get(index_key, ())
+        return [self._raw[key] for key in keys]
+
+    def raw_count(self, name, index_key):
+        "Return the number of the raw records in the index"
+        return len(self._raw_index[name].get(index_key, ()))
+
+    def is_raw(self, key):
+        "Return `True` if the object of the key is a raw record not created yet"
+        return key in self._raw
+
+    def find_id(self, id):
+        "Return the created object of the NSoT ID"
+        obj = self._hydrated.get(self._ids.get(id))
+        if obj is not None and obj._nsot_obj.get("id") == id:
+            return obj
+
+    def get_by_id(self, id):
+        "Return the object of the NSoT ID, created from the raw record if needed"
+        key = self._ids.get(id)
+        if key is None:
+            return None
+
+        obj = self.hydrate(key)
+        if obj is not None and obj._nsot_obj.get("id") == id:
+            return obj
+
+    def _get_field_index(self, field):
+        "Return the index of the field, built on first use"
+        try:
+            return self._field_index[field][1]
+        except KeyError:
+            pass
+
+        position = self._manager._model._args.index(field)
+        index = {}
+        for key in self:
+            index.setdefault(key[position], {})[key] = None
+        self._field_index[field] = position, index
+        return index
+
+    @staticmethod
+    def _index_value(value):
+        "Return the value in the resource key, a resource is its natural key"
+        return str(value) if isinstance(value, Resource) else value
+
+    def lookup(self, query):
+        """
+        Return the objects that may match the indexed conditions of the query.
+        The exact and in lookups of the NSoT ID and the fields of the resource
+        arguments, and the exact, in and startswith lookups of the attributes
+        ex. `attributes__role="leaf"` are indexed
+        :param query (Query): the compiled query
+        :return: list of objects or `None` if no condition is indexed
+        """
+        try:
+            keys = self._lookup_keys(query)
+            keys = self._lookup_attribute_keys(query, keys)
+        except TypeError:
+            # unhashable value, the objects is filtered without the indexes
+            return None
+
+        if keys is None:
+            return None
+        return [obj for obj in map(self.hydrate, keys) if obj is not None]
+
+    def _lookup_keys(self, query):
+        "Return the resource keys of the ID and the resource arguments conditions"
+        args = self._manager._model._args
+        conditions = {
+            k: [self._index_value(v) for v in values]
+            for k, values in query.indexable(("id", *args)).items()
+        }
+        if not conditions:
+            return None
+
+        if "id" in conditions:
+            return [self._ids.get(id) for id in conditions["id"]]
+
+        if len(conditions) == len(args) and all(
+            len(values) == 1 for values in conditions.values()
+        ):
+            return [tuple(conditions[a][0] for a in args)]
+
+        keys = None
+        for field, values in conditions.items():
+            index = self._get_field_index(field)
+            field_keys = {k: None for v in values for k in index.get(v, ())}
+            if keys is None:
+                keys = list(field_keys)
+            else:
+                keys = [key for key in keys if key in field_keys]
+            if not keys:
+                break
+        return keys
+
+    def _lookup_attribute_keys(self, query, keys):
+        "Narrow the resource keys with the attribute conditions"
+        site_ids = query.indexable(("site_id",)).get("site_id")
+
+        for condition in query.conditions:
+            if (
+                len(condition.path) != 2
+                or condition.path[0] != "attributes"
+                or callable(condition.value)
+            ):
+                continue
+
+            name = condition.path[1]
+            if condition.lookup in ("exact", "in"):
+                attribute_keys = self.attribute_keys(
+                    name, values=condition.values(), site_ids=site_ids
+                )
+            elif condition.lookup == "startswith":
+                attribute_keys = self.attribute_keys(
+                    name, prefix=condition.value, site_ids=site_ids
+                )
+            else:
+                continue
+
+            if keys is None:
+                keys = list(attribute_keys)
+            else:
+                keys = [key for key in keys if key in attribute_keys]
+        return keys
+
+    def mark_dirty(self, key):
+        "Track the object of the key as new or changed"
+        self._dirty[key] = None
+
+    def mark_clean(self, key):
+        "Stop tracking the object of the key, it has no changes"
+        self._dirty.pop(key, None)
+
+    def is_dirty(self, key):
+        return key in self._dirty
+
+    def dirty(self):
+        "Return the dirty objects, the objects that may have changes"
+        return [self._hydrated[k] for k in list(self._dirty) if k in self._hydrated]
+
+    def hydrated_get(self, key):
+        "Return the created object of the key"
+        return self._hydrated.get(key)
+
+    def hydrated(self):
+        "Return the objects already created, the raw records are not created"
+        return self._hydrated.values()
+
+    def values(self):
+        "Return all the objects, the remaining raw records are created"
+        for key in list(self._raw):
+            self.hydrate(key)
+        return self._hydrated.values()
+
+    def get(self, key, default=None):
+        obj = self.hydrate(key)
+        return default if obj is None else obj
+
+    def pop(self, key, default=None):
+        nsot_obj = self._pop_raw(key)
+        obj = self._hydrated.pop(key, None)
+        self._dirty.pop(key, None)
+
+        for record in (nsot_obj, obj and obj._nsot_obj):
+            if record and self._ids.get(record.get("id")) == key:
+                del self._ids[record["id"]]
+        self._remove_key(key)
+
+        attributes = obj.attributes if obj is not None else {}
+        if nsot_obj:
+            attributes = {**nsot_obj.get("attributes", {}), **attributes}
+        self.index_attributes(key, attributes, {})
+
+        return default if obj is None else obj
+
+    def __getitem__(self, key):
+        obj = self.hydrate(key)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __setitem__(self, key, obj):
+        if key not in self._raw and key not in self._hydrated:
+            self._add_key(key)
+        self._hydrated[key] = obj
+
+    def __contains__(self, key):
+        return key in self._hydrated or key in self._raw
+
+    def __iter__(self):
+        yield from list(self._hydrated)
+        yield from list(self._raw)
+
+    def __len__(self):
+        return len(self._hydrated) + len(self._raw)
+
+
 class ResourceManager:
-    """Holds resource class objects and a helper query function"""
+    """Holds resource class objects and a helper query function
+
+    The objects of the resource model are fetched from the NSoT server on first
+    access of the manager objects and not when the model is defined. Only the
+    raw NSoT objects are kept on load, see `ResourceStore`.
+    """
 
     def __init__(self, model=None, nsot_objects=None, **kwargs):
-        self._objects = {}
+        self._cache = ResourceStore(self)
+        self._loaded = False
         self._model = model
         self._nsot_objects = nsot_objects
 
         for k, v in kwargs.items():
             setattr(self, f"_{k}", v)
 
+    @property
+    def _objects(self):
+        "The cache objects of the resource model, loaded on first access"
+        if not self._loaded:
+            self.load()
+        return self._cache
+
+    def load(self, page_size=None):
+        """
+        Add the existing NSoT resource objects as raw records, the objects
+        are fetch page by page and instantiated on first access
+        :param page_size (int): number of objects per request, default to
+            `NSOT_PAGE_SIZE`
+        """
+        # mark as loaded first, creating an instance look up the cache objects
+        self._loaded = True
+
+        name = self._model._resource_name
+        store = self._cache
+
+        # the store owns the raw records, the NSoT objects already fetched are
+        # not kept in the client cache so the created ones are released
+        nsot_objects = NSoTClient._resource_cache.pop(name, None)
+        if nsot_objects is not None:
+            for nsot_obj in nsot_objects.values():
+                store.add_raw(nsot_obj)
+        else:
+            with metrics.phase("loading"):
+                for nsot_obj in NSoTClient.iter_resource(name, page_size):
+                    store.add_raw(nsot_obj)
+
     def create(self, *args, **kwargs):
         obj = self._model(*args, **kwargs)
         obj.update_post()
 
-    def post_update(self):
-        for obj in self._objects.values():
-            obj.update_post()
+    def pending_count(self):
+        """Return the number of the new or changed objects, an object that is
+        changed back to the NSoT object is counted until compared"""
+        return len(self._cache._dirty)
+
+    def post_update(self, chunk_size=None):
+        """POST the new objects and PATCH the changed objects in bulk
+        :param chunk_size (int): number of objects per request
+        """
+        self.bulk_create(chunk_size=chunk_size)
+        self.bulk_update(chunk_size=chunk_size)
+
+    def bulk_create(self, objects=None, chunk_size=None):
+        """
+        POST the new objects grouped by site in chunks, one request per chunk
+        and assign the NSoT objects from the response back to the objects
+        :param objects (list): the objects to create, default to the dirty
+            cache objects
+        :param chunk_size (int): number of objects per request, default to
+            `NSOT_BULK_CHUNK_SIZE`
+        :return: list of the created objects
+        """
+        if objects is None:
+            objects = self._objects.dirty()
+
+        if chunk_size is None:
+            chunk_size = C.NSOT_BULK_CHUNK_SIZE
+
+        sites = defaultdict(list)
+        for obj in objects:
+            if not obj.exists():
+                sites[obj.site_id].append(obj)
+
+        created = []
+        for site_objects in sites.values():
+            for obj in site_objects:
+                obj._prepare_update()
+
+            # the dependencies of the objects may have POST the object
+            site_objects = [obj for obj in site_objects if not obj.exists()]
+
+            for chunk in chunks(site_objects, chunk_size):
+                created.extend(self._bulk_post(chunk))
+
+        return created
+
+    @nsot_request
+    def _bulk_post(self, objects):
+        "POST the objects of the same site in a single request"
+        nsot_objects = objects[0]._resource.post(
+            [obj._get_payload() for obj in objects]
+        )
+
+        # NSoT returns the created objects in the same order of the payload
+        for obj, nsot_obj in zip(objects, nsot_objects):
+            obj._nsot_obj = nsot_obj
+            obj._clean()
+
+        logger.info(f"{self._model.__name__} bulk POST {len(objects)} objects")
+        return objects
+
+    def bulk_update(self, objects=None, chunk_size=None):
+        """
+        PATCH the changed objects grouped by site in chunks, one request per
+        chunk to the collection endpoint and refresh the NSoT objects from the
+        response
+        :param objects (list): the objects to update, default to the dirty
+            cache objects
+        :param chunk_size (int): number of objects per request, default to
+            `NSOT_BULK_CHUNK_SIZE`
+        :return: list of the updated objects
+        """
+        if objects is None:
+            objects = self._objects.dirty()
+
+        if chunk_size is None:
+            chunk_size = C.NSOT_BULK_CHUNK_SIZE
+
+        sites = defaultdict(list)
+        for obj in objects:
+            if obj.exists():
+                obj._prepare_update()
+                if obj.has_changes():
+                    sites[obj.site_id].append(obj)
+
+        updated = []
+        for site_objects in sites.values():
+            for chunk in chunks(site_objects, chunk_size):
+                updated.extend(self._bulk_patch(chunk))
+
+        return updated
+
+    @nsot_request
+    def _bulk_patch(self, objects):
+        """PATCH the objects of the same site in a single request, only the
+        changed fields of the objects are sent"""
+        nsot_objects = objects[0]._resource.patch(
+            [obj._get_patch() for obj in objects]
+        )
+
+        nsot_objects = {nsot_obj["id"]: nsot_obj for nsot_obj in nsot_objects}
+        for obj in objects:
+            obj._nsot_obj = nsot_objects.get(obj.id, obj._nsot_obj)
+            obj._clean()
+
+        logger.info(f"{self._model.__name__} bulk PATCH {len(objects)} objects")
+        return objects
+
+    def apply_change(self, event, nsot_obj):
+        """
+        Apply a NSoT change to the cache objects
+        :param event (str): the change event `Create`, `Update` or `Delete`
+        :param nsot_obj (dict): the NSoT resource object of the change
+        :return: the object affected by the change if any
+        """
+        model = self._model
+        key = model._nsot_key(nsot_obj)
+        store = self._objects
+
+        obj = store.find_id(nsot_obj["id"]) or store.hydrated_get(key)
+
+        # the object is not created yet, only the raw record is replaced
+        if obj is None:
+            store.discard_raw(nsot_obj["id"])
+            if event != "Delete":
+                store.add_raw(nsot_obj)
+            return None
+
+        if event == "Delete":
+            obj._remove()
+            logger.info(f"{obj._key} removed by change")
+            return obj
+
+        if obj._key != key:
+            # the natural key has changed
+            obj._remove()
+            obj = model(*key, nsot_obj=nsot_obj)
+
+        obj._refresh(nsot_obj)
+        logger.info(f"{obj._key} refreshed by change")
+        return obj
+
+    def _candidates(self, query):
+        "Return the objects that may match the query, see `ResourceStore.lookup`"
+        objects = self._objects.lookup(query)
+        if objects is None:
+            objects = self._objects.values()
+        return iter(objects)
 
     def filter(self, **kwargs):
+        """
+        Yield the objects that match the kwargs, see `Query` for the lookups
+        ex. `filter(cidr__startswith="10.", prefix_length__gte=24)`
+        """
         if not kwargs:
             return []
-        yield from filter_objects(iter(self._objects.values()), **kwargs)
-        # yield from filter(lambda x: all(f(x) for f in args), x)
+        query = Query(**kwargs)
+        yield from query.filter(self._candidates(query))
 
     def get(self, **kwargs):
-        objects = iter(self._objects.values())
+        """Return the first object that matches the kwargs, if kwargs is not
+        provided it return all the objects"""
         if not kwargs:
-            return list(objects)
-        return get_objects(objects, **kwargs)
+            return list(self._objects.values())
+        query = Query(**kwargs)
+        return query.get(self._candidates(query))
 
 
 class Resource:
@@ -144,17 +743,26 @@ class Resource:
 
     https://python-patterns.guide/gang-of-four/flyweight/
 
-    Resource specific argurments is defined in class model _args variable
+    Resource specific argurments is defined in class model _args variable, the
+    other attributes of the object is defined in class model _fields variable.
+    The attributes are stored in fixed slots of a class generated per model,
+    so every subclass must define `__slots__` to keep the objects compact.
     """
 
+    __slots__ = ("_attrs", "_payload", "_nsot_object", "_key")
+
+    # the resource models, key by the NSoT resource name
+    _models = {}
+
+    # the object attributes besides the _args
+    _fields = ()
+
     def __init_subclass__(cls):
-        """Customise subclass creation and create class instance from the
-        existing NSoT resource objects"""
+        """Customise subclass creation, the existing NSoT resource objects is
+        loaded by the model manager on first use"""
 
         model = cls.__name__
         name = model.lower() + "s"
-        resource = getattr(NSoTClient.resource, name)
-        nsot_objects = resource.get()
 
         for attr in ResourceAttributes.get(name):
             if isinstance(attr, tuple):
@@ -163,20 +771,17 @@ class Resource:
                 setattr(cls, attr, NSoTObjectDescriptor(attr))
 
         setattr(cls, "_resource", EndpointDescriptor(name))
+        cls._resource_name = name
+        cls._attrs_class = make_slot_attrs(
+            f"{model}Attrs", (*cls._args, "site_name", *cls._fields)
+        )
 
         if getattr(cls, "manager", None) is None:
             cls.manager = ResourceManager()
 
         cls.manager._model = cls
-        cls.manager._nsot_objects = {obj["id"]: obj for obj in nsot_objects}
 
-        if getattr(cls, "_sort_objects_by", None):
-            nsot_objects = sorted(
-                nsot_objects, key=lambda x: x[cls._sort_objects_by]
-            )
-
-        for nsot_obj in nsot_objects:
-            cls(*[nsot_obj.get(k) for k in cls._args], nsot_obj=nsot_obj)
+        Resource._models[name] = cls
 
     def __new__(cls, *args, **kwargs):
 
@@ -189,7 +794,7 @@ class Resource:
                 f"object '{cls.__name__}' missing reqiured argurments {required_args}"
             )
 
-        new_attrs = AttrDict({k: v for k, v in zip(cls._args, args)})
+        new_attrs = cls._attrs_class(zip(cls._args, args))
 
         nsot_obj = kwargs.pop("nsot_obj", {})
 
@@ -212,6 +817,9 @@ class Resource:
         object = cls.manager._objects.get(key)
 
         if object:
+            # the object was created before its NSoT object is loaded
+            if nsot_obj and not object._nsot_obj:
+                object._refresh(nsot_obj)
             logger.info(f"{key} returning cache object")
             return object
         else:
@@ -229,6 +837,8 @@ class Resource:
             self._nsot_obj = nsot_obj
 
             cls.manager._objects[key] = self
+            if not nsot_obj:
+                self._mark_dirty()
 
             # pass the object back to class for spefic object attributes
             if getattr(cls, "_pre_init", None):
@@ -236,6 +846,38 @@ class Resource:
 
             return self
 
+    @property
+    def _nsot_obj(self):
+        "The NSoT object, empty if the resource is not exists in NSoT server"
+        return self._nsot_object
+
+    @_nsot_obj.setter
+    def _nsot_obj(self, nsot_obj):
+        old_nsot_obj = getattr(self, "_nsot_object", None)
+        old_attributes = self.attributes if old_nsot_obj is not None else {}
+        self._nsot_object = nsot_obj
+
+        # keep the NSoT ID and attribute indexes of the manager up to date
+        store = self.__class__.manager._cache
+        store._update_id(self._key, old_nsot_obj, nsot_obj)
+        store.index_attributes(self._key, old_attributes, self.attributes)
+
+    def _set_attributes(self, attributes):
+        "Replace the attributes and update the attribute index"
+        old_attributes = self.attributes
+        self._payload["attributes"] = attributes
+        self._index_attributes(old_attributes)
+
+    def _index_attributes(self, old_attributes):
+        self.__class__.manager._cache.index_attributes(
+            self._key, old_attributes, self.attributes
+        )
+
+    @classmethod
+    def _nsot_key(cls, nsot_obj):
+        "Return the resource key of the NSoT object"
+        return tuple(nsot_obj.get(k) for k in cls._args)
+
     def __repr__(self):
         keys = ", ".join([str(k) for k in self._key])
         return f"<{self.__class__.__name__}: {keys}>"
@@ -245,15 +887,20 @@ class Resource:
         return f"{natural_name}"
 
     def __getattr__(self, key):
+        # the slot is not set yet, avoid recursion
+        if key == "_attrs":
+            raise AttributeError(key)
 
-        found = True
-        try:
-            return self._attrs[key]
-        except KeyError:
-            found = False
+        attrs = self._attrs
+        if key in attrs._field_names:
+            try:
+                return getattr(attrs, key)
+            except AttributeError:
+                pass
 
-        if not found:
-            raise AttributeError(f"'Network' object has no attribute '{key}'")
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{key}'"
+        )
 
     def __eq__(self, other):
         try:
@@ -268,12 +915,35 @@ class Resource:
         "Return `True` if resource exists in NSoT server"
         return bool(self._nsot_obj)
 
+    def _mark_dirty(self):
+        "Track the resource as new or changed, see `has_changes`"
+        self.__class__.manager._cache.mark_dirty(self._key)
+
+    def _clean(self):
+        "Stop tracking the resource as dirty if the commit has no changes left"
+        self.has_changes()
+
+    def has_changes(self):
+        """Return `True` if resource is new or has changes to PATCH in NSoT server,
+        only the dirty resources are compared and cleaned if no changes"""
+        store = self.__class__.manager._cache
+        if not store.is_dirty(self._key):
+            return False
+
+        if not self._nsot_obj or self._get_changes():
+            return True
+
+        store.mark_clean(self._key)
+        return False
+
     def add_attributes(self, **kwargs):
         """Add attributes to the existing attributes
         The attribute name must be first exists in NSoT server otherwise raises
         Exception
         :param kwargs (str/str|list): key/value of the attribute
         """
+        old_attributes = dict(self.attributes)
+        self._mark_dirty()
         try:
             self._payload["attributes"].update(kwargs)
         except KeyError:
@@ -281,12 +951,15 @@ class Resource:
                 **self._nsot_obj.get("attributes", {}),
                 **kwargs,
             }
+        self._index_attributes(old_attributes)
 
     def remove_attributes(self, *args):
         """
         Remove attributes to the current attributes
         :param args (str): name of the attribute
         """
+        old_attributes = dict(self.attributes)
+        self._mark_dirty()
         attributes = self._payload.get("attributes")
         if attributes:
             for name in args:
@@ -300,21 +973,63 @@ class Resource:
                 for k, v in self._nsot_obj.get("attributes", {}).items()
                 if k not in args
             }
+        self._index_attributes(old_attributes)
+
+    def _prepare_update(self):
+        "POST the dependencies of the resource and update the payload"
+        if getattr(self, "_pre_update", None):
+            self._pre_update()
+
+    def _get_payload(self):
+        "Return the payload of POST request, the full object"
+        return {**self._nsot_obj, **self._payload}
+
+    def _get_changes(self):
+        """Return the fields of the payload that differ from the NSoT object,
+        the attributes and the unordered lists are compared as a whole since
+        NSoT replaces them"""
+        nsot_obj = self._nsot_obj
+        changes = {}
+        for name, value in self._payload.items():
+            old_value = nsot_obj.get(name)
+            if name in UNORDERED_FIELDS and value is not None:
+                try:
+                    changed = set(value) != set(old_value or ())
+                except TypeError:
+                    changed = value != old_value
+            else:
+                changed = value != old_value
+            if changed:
+                changes[name] = value
+        return changes
+
+    def _get_patch(self):
+        "Return the payload of PATCH request, the ID and the changed fields"
+        patch = {"id": self._nsot_obj["id"], **self._get_changes()}
+        metrics.record_patch(
+            self._resource_name,
+            self.site_id,
+            payload_size(self._get_payload()),
+            payload_size(patch),
+        )
+        return patch
 
     @nsot_request
     def update_post(self):
         """POST or PATCH resource in NSoT server"""
+        self._prepare_update()
+
         obj = self._nsot_obj
 
-        payload = {**obj, **self._payload}
         if obj:
-            if payload != obj:
-                self._nsot_obj = self._resource(obj["id"]).patch(payload)
+            if self._get_changes():
+                self._nsot_obj = self._resource(obj["id"]).patch(self._get_patch())
                 logger.info(f"{self._key} PATCH")
         else:
-            self._nsot_obj = self._resource.post(payload)
+            self._nsot_obj = self._resource.post(self._get_payload())
             logger.info(f"{self._key} POST")
 
+        self._clean()
         return self._nsot_obj
 
     @nsot_request
@@ -324,11 +1039,12 @@ class Resource:
         if _id:
             self._resource(_id).delete()
             self._nsot_obj = {}
+            # remove from the cache objects and the indexes before the reset
+            self._remove()
             self._payload = {
                 **{k: v for k, v in zip(self._key, self._args[:-1])},
                 "attributes": {},
             }
-            del self.__class__.manager._objects[self._key]
             logger.info(f"{self._key} DELETE")
             return True
         else:
@@ -337,3 +1053,24 @@ class Resource:
     def get(self):
         "Return the NsoT object"
         return self._nsot_obj
+
+    def _refresh(self, nsot_obj):
+        "Replace the NSoT object with the server copy and update the links"
+        old_nsot_obj = self._nsot_obj
+        self._nsot_obj = nsot_obj
+
+        # the object is now exists in NSoT server, discard the create payload
+        if not old_nsot_obj:
+            old_attributes = self.attributes
+            self._payload = {}
+            self._index_attributes(old_attributes)
+
+        if getattr(self, "_sync", None):
+            self._sync(old_nsot_obj)
+
+    def _remove(self):
+        "Remove the object and its links to other objects in the cache objects"
+        if getattr(self, "_unlink", None):
+            self._unlink()
+
+        self.__class__.manager._objects.pop(self._key, None)
@@ -0,0 +1,133 @@
+import random
+import time
+from collections import Counter
+from threading import Lock
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+import pynetcf.constants as C
+
+# HTTP status of a failed request that may succeed if retried
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# HTTP methods that is safe to send again, a POST or PATCH may already be
+# applied by the server so it is only retried if rejected with 429
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# counters of the NSoT requests for monitoring
+stats = Counter()
+
+
+class CircuitOpenError(ConnectionError):
+    "Raised when the circuit breaker is open and the request is not sent"
+
+
+class CircuitBreaker:
+    """Fail fast when the NSoT server is unhealthy
+
+    After `NSOT_CIRCUIT_THRESHOLD` consecutive server failures the circuit is
+    open and the requests fail without calling the server. After
+    `NSOT_CIRCUIT_RESET_TIMEOUT` seconds a trial request is allowed, the
+    circuit is closed if it succeed otherwise open again.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def state(self):
+        "Return the state of the circuit `closed`, `open` or `half-open`"
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < C.NSOT_CIRCUIT_RESET_TIMEOUT:
+            return "open"
+        return "half-open"
+
+    def before_request(self):
+        "Raise `CircuitOpenError` if the circuit is open"
+        with self._lock:
+            state = self.state
+            if state == "open":
+                stats["circuit_rejected"] += 1
+                raise CircuitOpenError(
+                    f"NSoT server is unhealthy after {self._failures} failures"
+                )
+            if state == "half-open":
+                # allow a single trial request until its result is known
+                self._opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= C.NSOT_CIRCUIT_THRESHOLD:
+                if self._opened_at is None:
+                    stats["circuit_opened"] += 1
+                self._opened_at = time.monotonic()
+
+
+circuit_breaker = CircuitBreaker()
+
+
+def get_status(exc):
+    "Return the HTTP status of the failed request or `None` if no response"
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def get_method(exc):
+    "Return the HTTP method of the failed request if known"
+    response = getattr(exc, "response", None)
+    request = getattr(response, "request", None) or getattr(exc, "request", None)
+    return getattr(request, "method", None)
+
+
+def is_server_failure(exc):
+    "Return `True` if the error is caused by an unhealthy server"
+    status = get_status(exc)
+    if status is None:
+        return isinstance(exc, (RequestsConnectionError, Timeout))
+    return status >= 500
+
+
+def get_retry_delay(exc, attempt):
+    """
+    Return the seconds to wait before retrying the failed request or `None`
+    if the request must not be retried
+    :param exc (Exception): the error of the failed request
+    :param attempt (int): number of previous retries
+    """
+    if attempt >= C.NSOT_RETRIES:
+        return None
+
+    status = get_status(exc)
+    method = get_method(exc)
+
+    if status == 429:
+        # the request is not processed, safe to retry any method
+        pass
+    elif method not in IDEMPOTENT_METHODS:
+        return None
+    elif status is None:
+        if not isinstance(exc, (RequestsConnectionError, Timeout)):
+            return None
+    elif status not in RETRY_STATUS:
+        return None
+
+    # jittered exponential backoff
+    delay = min(C.NSOT_RETRY_BACKOFF_MAX, C.NSOT_RETRY_BACKOFF * 2 ** attempt)
+    delay = random.uniform(delay / 2, delay)
+
+    try:
+        retry_after = float(exc.response.headers["Retry-After"])
+        delay = max(delay, min(retry_after, C.NSOT_RETRY_BACKOFF_MAX))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        pass
+
+    return delay
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from pynetcf.utils.database import get_database
+from pynetcf.utils.logger import get_logger
+
+TABLES = (
+    """ CREATE TABLE IF NOT EXISTS objects (
+            resource TEXT NOT NULL,
+            site_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (resource, id)
+        ); """,
+    """ CREATE TABLE IF NOT EXISTS generations (
+            resource TEXT NOT NULL,
+            site_id INTEGER NOT NULL,
+            generation INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (resource, site_id)
+        ); """,
+    """ CREATE TABLE IF NOT EXISTS staging (
+            resource TEXT NOT NULL,
+            site_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (resource, site_id, id)
+        ); """,
+    """ CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ); """,
+)
+
+logger = get_logger(__name__)
+
+
+def _site_id(resource_name, nsot_obj):
+    "Return the site ID of the NSoT object, a site is its own site"
+    if resource_name == "sites":
+        return int(nsot_obj["id"])
+    return int(nsot_obj["site_id"])
+
+
+def _digest(rows):
+    """Return the digest of the JSON list of the NSoT objects, the rows are the
+    JSON of the objects with sorted keys ordered by ID"""
+    sha1 = hashlib.sha1(b"[")
+    for i, data in enumerate(rows):
+        if i:
+            sha1.update(b", ")
+        sha1.update(data.encode())
+    sha1.update(b"]")
+    return sha1.hexdigest()
+
+
+class Snapshot:
+    """On-disk snapshot of the raw NSoT objects per resource and site
+
+    Each resource and site pair has a generation number that is increase
+    every time the saved objects are different from the previous snapshot.
+    A connection is open per call so a snapshot can be saved from a
+    background thread.
+    """
+
+    def __init__(self, name="snapshot"):
+        self._db_path = get_database(name)
+
+        with self._connect() as conn:
+            for t in TABLES:
+                conn.execute(t)
+
+    def _connect(self):
+        return sqlite3.connect(self._db_path)
+
+    def exists(self, resource_name):
+        "Return `True` if there is a snapshot of the resource"
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM generations WHERE resource=? LIMIT 1",
+                (resource_name,),
+            ).fetchone()
+        return bool(row)
+
+    def load(self, resource_name):
+        """Return the NSoT objects of all sites of the resource or `None` if
+        there is no snapshot of the resource"""
+        if not self.exists(resource_name):
+            return None
+
+        nsot_objects = list(self.iter_objects(resource_name))
+
+        logger.info(
+            f"[Snapshot] loaded {len(nsot_objects)} {resource_name} from snapshot"
+        )
+        return nsot_objects
+
+    def iter_objects(self, resource_name, page_size=None):
+        """Yield the NSoT objects of all sites of the resource, the rows are
+        read `page_size` at a time"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT data FROM objects WHERE resource=? ORDER BY id",
+                (resource_name,),
+            )
+            while True:
+                rows = cursor.fetchmany(page_size or 1000)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    yield json.loads(data)
+
+    def generation(self, resource_name, site_id):
+        "Return the generation number of the resource site snapshot"
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT generation FROM generations WHERE resource=? AND site_id=?",
+                (resource_name, int(site_id)),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_meta(self, key, default=None):
+        "Return the value of the snapshot metadata"
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        "Set the value of the snapshot metadata"
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta(key,value) VALUES(?,?)",
+                (key, json.dumps(value)),
+            )
+
+    def begin(self, resource_name):
+        "Discard the staged NSoT objects of the resource before staging new ones"
+        with self._connect() as conn:
+            conn.execute("DELETE FROM staging WHERE resource=?", (resource_name,))
+
+    def stage(self, resource_name, nsot_objects):
+        """
+        Stage the NSoT objects of the resource to be saved by `save`, so the
+        objects are written page by page instead of held in memory
+        :param resource_name (str): name of the resource ex. networks
+        :param nsot_objects (iterable): the NSoT objects of the resource
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO staging(resource,site_id,id,data) "
+                "VALUES(?,?,?,?)",
+                (
+                    (
+                        resource_name,
+                        _site_id(resource_name, obj),
+                        obj["id"],
+                        json.dumps(obj, sort_keys=True),
+                    )
+                    for obj in nsot_objects
+                ),
+            )
+
+    def save(self, resource_name, nsot_objects=None):
+        """
+        Save the staged NSoT objects of the resource, only the sites which
+        objects has changed is rewritten and its generation increase
+        :param resource_name (str): name of the resource ex. networks
+        :param nsot_objects (iterable): all the NSoT objects of the resource,
+            staged first if given otherwise the objects staged by `stage`
+        :return: list of site ID which snapshot has changed
+        """
+        if nsot_objects is not None:
+            self.begin(resource_name)
+            self.stage(resource_name, nsot_objects)
+
+        changed = []
+        now = time.time()
+
+        with self._connect() as conn:
+            current = {
+                site_id: (generation, digest)
+                for site_id, generation, digest in conn.execute(
+                    "SELECT site_id,generation,digest FROM generations "
+                    "WHERE resource=?",
+                    (resource_name,),
+                )
+            }
+            staged = {
+                site_id
+                for (site_id,) in conn.execute(
+                    "SELECT DISTINCT site_id FROM staging WHERE resource=?",
+                    (resource_name,),
+                )
+            }
+
+            # the sites that no longer have objects are removed
+            for site_id in sorted(staged | set(current)):
+                generation, digest = current.get(site_id, (0, None))
+                new_digest = _digest(
+                    data
+                    for (data,) in conn.execute(
+                        "SELECT data FROM staging WHERE resource=? AND site_id=? "
+                        "ORDER BY id",
+                        (resource_name, site_id),
+                    )
+                )
+
+                if new_digest == digest:
+                    conn.execute(
+                        "UPDATE generations SET updated=? "
+                        "WHERE resource=? AND site_id=?",
+                        (now, resource_name, site_id),
+                    )
+                    continue
+
+                conn.execute(
+                    "DELETE FROM objects WHERE resource=? AND site_id=?",
+                    (resource_name, site_id),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO objects(resource,site_id,id,data) "
+                    "SELECT resource,site_id,id,data FROM staging "
+                    "WHERE resource=? AND site_id=?",
+                    (resource_name, site_id),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO "
+                    "generations(resource,site_id,generation,digest,updated) "
+                    "VALUES(?,?,?,?,?)",
+                    (resource_name, site_id, generation + 1, new_digest, now),
+                )
+                changed.append(site_id)
+
+            conn.execute("DELETE FROM staging WHERE resource=?", (resource_name,))
+
+        if changed:
+            logger.info(
+                f"[Snapshot] saved {resource_name} new generation of sites {changed}"
+            )
+        return changed
+
+    def clear(self, resource_name=None):
+        "Delete the snapshot of the resource or all the resources if `None`"
+        with self._connect() as conn:
+            if resource_name is None:
+                conn.execute("DELETE FROM staging")
+                conn.execute("DELETE FROM objects")
+                conn.execute("DELETE FROM generations")
+                conn.execute("DELETE FROM meta")
+            else:
+                conn.execute(
+                    "DELETE FROM staging WHERE resource=?", (resource_name,)
+                )
+                conn.execute(
+                    "DELETE FROM objects WHERE resource=?", (resource_name,)
+                )
+                conn.execute(
+                    "DELETE FROM generations WHERE resource=?", (resource_name,)
+                )
+                conn.execute(
+                    "DELETE FROM meta WHERE key LIKE ?", (f"{resource_name}.%",)
+                )
@@ -0,0 +1,65 @@
+import pynetcf.constants as C
+from pynetcf.utils.logger import get_logger
+from .client import NSoTClient, nsot_request
+from .endpoint import Endpoint
+from .resource import Resource
+
+logger = get_logger(__name__)
+
+
+@nsot_request
+def get_changes(since_id, page_size=None):
+    """
+    Return the NSoT changes after the change ID, oldest first. NSoT returns
+    the changes newest first so the pages is fetch until the change ID is found
+    :param since_id (int): the ID of the last change seen
+    :param page_size (int): number of changes per request, default to
+        `NSOT_CHANGES_PAGE_SIZE`
+    """
+    if page_size is None:
+        page_size = C.NSOT_CHANGES_PAGE_SIZE
+
+    changes = []
+    endpoint = Endpoint(NSoTClient.resource.changes, name="changes")
+
+    for page in NSoTClient.iter_pages(endpoint, page_size):
+        for change in page:
+            if int(change["id"]) <= since_id:
+                return sorted(changes, key=lambda x: int(x["id"]))
+            changes.append(change)
+
+    return sorted(changes, key=lambda x: int(x["id"]))
+
+
+def sync(page_size=None):
+    """
+    Apply the NSoT changes since the last sync to the cache objects of the
+    resource models, only the created, updated and deleted objects are fetch
+    :param page_size (int): number of changes per request
+    :return: the number of changes applied
+    """
+    since_id = NSoTClient._change_id
+
+    # nothing is loaded yet, the objects will be up to date on first use
+    if since_id is None:
+        return 0
+
+    changes = get_changes(since_id, page_size)
+
+    for change in changes:
+        name = change["resource_name"].lower() + "s"
+        event = change["event"]
+        nsot_obj = change["resource"]
+
+        NSoTClient.apply_change(name, event, nsot_obj)
+
+        model = Resource._models.get(name)
+        if model is not None and model.manager._loaded:
+            model.manager.apply_change(event, nsot_obj)
+
+        NSoTClient._change_id = int(change["id"])
+
+    if changes:
+        logger.info(f"applied {len(changes)} changes up to {NSoTClient._change_id}")
+
+    return len(changes)
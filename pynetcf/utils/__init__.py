@@ -1,35 +1,30 @@
+from .query import Query
+
+
 def filter_objects(objects, **kwargs):
-    """Filter objects based on kwargs"""
+    """Filter objects based on kwargs, see `Query` for the lookups"""
     if kwargs:
-        for obj in objects:
-            query = []
-            try:
-                for key, value in kwargs.items():
-                    try:
-                        attr_value = value(getattr(obj, key))
-                        query.append(attr_value)
-                    except TypeError:
-                        attr_value = getattr(obj, key)
-                        query.append(value == attr_value)
-                if all(query):
-                    yield obj
-            except AttributeError:
-                pass
+        yield from Query(**kwargs).filter(objects)
 
 
 def get_objects(objects, **kwargs):
-    """Return a single object based on kwargs, if kwargs is not provided it
-    return all the objects"""
-    # found = True
-    try:
-        filtered = filter_objects(objects, **kwargs)
-        return next(filtered)
-    except StopIteration:
+    """Return the first object that matches the kwargs, `None` if kwargs is
+    not provided"""
+    if not kwargs:
         return None
+    return Query(**kwargs).get(objects)
+
 
-    # if not found:
-    #     _kwargs = ", ".join(["{}={}".format(k, v) for k, v in kwargs.items()])
-    #     raise ValueError("No object found with keyword arguments {}".format(_kwargs))
+def chunks(objects, size):
+    """Yield lists of `size` objects from the objects"""
+    chunk = []
+    for obj in objects:
+        chunk.append(obj)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 class AttrDict(dict):
@@ -41,3 +36,94 @@ class AttrDict(dict):
 
     def __setattr__(self, key, value):
         self[key] = value
+
+
+class LazyAttribute:
+    """A class attribute that is computed by the decorated function on first
+    access and then cached on the owner class, use to defer expensive setup
+    such as HTTP requests until the attribute is actually needed"""
+
+    def __init__(self, func):
+        self._func = func
+        self._name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, obj, type=None):
+        owner = type if type is not None else obj.__class__
+        value = self._func(owner)
+        # replace the descriptor with the computed value
+        setattr(owner, self._name, value)
+        return value
+
+
+class SlotAttrs:
+    """Base class of the compact attributes of an object, like `AttrDict` the
+    fields are accessible as keys and attributes but they are stored in fixed
+    slots instead of a dict. An unset field is a missing key.
+
+    The subclass with the fields is created with `make_slot_attrs`.
+    """
+
+    __slots__ = ()
+
+    _field_names = frozenset()
+
+    def __init__(self, mapping=()):
+        for key, value in dict(mapping).items():
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())})"
+
+    def __getitem__(self, key):
+        if key in self._field_names:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._field_names and hasattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        delattr(self, key)
+        return value
+
+    def update(self, mapping):
+        for key, value in mapping.items():
+            setattr(self, key, value)
+
+    def items(self):
+        for key in self.__slots__:
+            if hasattr(self, key):
+                yield key, getattr(self, key)
+
+
+def make_slot_attrs(name, fields):
+    """
+    Return a `SlotAttrs` subclass with a slot per field
+    :param name (str): name of the class
+    :param fields (list): the field names, duplicates are ignored
+    """
+    fields = tuple(dict.fromkeys(fields))
+    attrs = {"__slots__": fields, "_field_names": frozenset(fields)}
+    return type(name, (SlotAttrs,), attrs)
@@ -0,0 +1,106 @@
+from sortedcontainers import SortedList
+
+
+class Bitmap:
+    """An allocation bitmap of the numbers from 0 to size, a byte per number
+
+    The free numbers are found with `bytearray.find` and `bytearray.rfind`, so
+    a scan from the last found number is amortised O(1) per number.
+    """
+
+    __slots__ = ("_bytes", "_free")
+
+    def __init__(self, size):
+        """
+        :param size (int): number of the numbers, all free
+        """
+        self._bytes = bytearray(size)
+        self._free = size
+
+    def __len__(self):
+        return len(self._bytes)
+
+    def __contains__(self, num):
+        return 0 <= num < len(self._bytes) and self._bytes[num] == 1
+
+    @property
+    def free(self):
+        "The number of free numbers"
+        return self._free
+
+    def add(self, num):
+        "Mark the number as used"
+        if not self._bytes[num]:
+            self._bytes[num] = 1
+            self._free -= 1
+
+    def discard(self, num):
+        "Mark the number as free"
+        if self._bytes[num]:
+            self._bytes[num] = 0
+            self._free += 1
+
+    def next_free(self, start=0):
+        "Return the first free number from start, -1 if none"
+        return self._bytes.find(0, start)
+
+    def prev_free(self, stop=None):
+        "Return the last free number before stop, -1 if none"
+        return self._bytes.rfind(0, 0, len(self._bytes) if stop is None else stop)
+
+
+class SparseBitmap:
+    """An allocation bitmap of the numbers from 0 to size that stores only the
+    used numbers, for the sizes too large for `Bitmap`
+
+    The free numbers are found on the integer range, skipping the runs of the
+    sorted used numbers, so it takes memory per used number only.
+    """
+
+    __slots__ = ("_size", "_used")
+
+    def __init__(self, size):
+        """
+        :param size (int): number of the numbers, all free
+        """
+        self._size = size
+        self._used = SortedList()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, num):
+        return num in self._used
+
+    @property
+    def free(self):
+        "The number of free numbers"
+        return self._size - len(self._used)
+
+    def add(self, num):
+        "Mark the number as used"
+        if num not in self._used:
+            self._used.add(num)
+
+    def discard(self, num):
+        "Mark the number as free"
+        self._used.discard(num)
+
+    def next_free(self, start=0):
+        "Return the first free number from start, -1 if none"
+        used = self._used
+        index = used.bisect_left(start)
+        while index < len(used) and used[index] == start:
+            start += 1
+            index += 1
+        return start if start < self._size else -1
+
+    def prev_free(self, stop=None):
+        "Return the last free number before stop, -1 if none"
+        used = self._used
+        num = (self._size if stop is None else stop) - 1
+        index = used.bisect_right(num) - 1
+        while index >= 0 and used[index] == num:
+            num -= 1
+            index -= 1
+        return num
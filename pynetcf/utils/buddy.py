@@ -0,0 +1,113 @@
+from sortedcontainers import SortedList
+
+
+class BuddyAllocator:
+    """A buddy allocator of the subnets of a network
+
+    The free blocks are kept per prefix length as the sorted network addresses.
+    A block is split in half down to the allocated prefix length and a freed
+    block is merged with its free buddy, so the free blocks are always the
+    largest aligned blocks. The next free subnet of a prefix length is the
+    first block of the prefix lengths up to it, at most `width` lookups.
+    """
+
+    __slots__ = ("value", "prefixlen", "width", "_free")
+
+    def __init__(self, value, prefixlen, width=32):
+        """
+        :param value (int): the network address of the network, all free
+        :param prefixlen (int): the prefix length of the network
+        :param width (int): number of bits of the IP addresses
+        """
+        self.value = value
+        self.prefixlen = prefixlen
+        self.width = width
+        self._free = {prefixlen: SortedList([value])}
+
+    def _size(self, prefixlen):
+        return 1 << (self.width - prefixlen)
+
+    def _mask(self, value, prefixlen):
+        host_bits = self.width - prefixlen
+        return value >> host_bits << host_bits
+
+    def _add(self, value, prefixlen):
+        blocks = self._free.get(prefixlen)
+        if blocks is None:
+            blocks = self._free[prefixlen] = SortedList()
+        blocks.add(value)
+
+    def _containing(self, value, prefixlen):
+        "Return the prefix length of the free block that contains the subnet"
+        for p in range(prefixlen, self.prefixlen - 1, -1):
+            blocks = self._free.get(p)
+            if blocks and self._mask(value, p) in blocks:
+                return p
+        return None
+
+    def _discard_inside(self, value, prefixlen):
+        "Remove the free blocks inside the subnet"
+        last = value + self._size(prefixlen) - 1
+        for p, blocks in self._free.items():
+            if p > prefixlen:
+                for v in list(blocks.irange(value, last)):
+                    blocks.remove(v)
+
+    def is_free(self, value, prefixlen):
+        "Return `True` if the subnet is not allocated"
+        return self._containing(value, prefixlen) is not None
+
+    def allocate(self, value, prefixlen):
+        """
+        Mark the subnet as allocated, the free block that contains it is split
+        :param value (int): the network address of the subnet
+        :param prefixlen (int): the prefix length of the subnet
+        """
+        p = self._containing(value, prefixlen)
+        if p is None:
+            # the subnet is partly allocated ex. it contains allocated subnets
+            self._discard_inside(value, prefixlen)
+            return
+
+        self._free[p].remove(self._mask(value, p))
+        while p < prefixlen:
+            p += 1
+            self._add(self._mask(value, p) ^ self._size(p), p)
+
+    def free(self, value, prefixlen):
+        """
+        Mark the subnet as free, it is merged with the free buddies
+        :param value (int): the network address of the subnet
+        :param prefixlen (int): the prefix length of the subnet
+        """
+        if prefixlen < self.prefixlen or self.is_free(value, prefixlen):
+            return
+
+        self._discard_inside(value, prefixlen)
+        while prefixlen > self.prefixlen:
+            buddy = value ^ self._size(prefixlen)
+            blocks = self._free.get(prefixlen)
+            if not blocks or buddy not in blocks:
+                break
+            blocks.remove(buddy)
+            value = min(value, buddy)
+            prefixlen -= 1
+        self._add(value, prefixlen)
+
+    def first(self, prefixlen, reverse=False):
+        """
+        Return the network address of the first free subnet of the prefix length,
+        `None` if none
+        :param reverse (bool): `True` will return the last free subnet
+        """
+        found = None
+        for p, blocks in self._free.items():
+            if p > prefixlen or not blocks:
+                continue
+            if reverse:
+                value = blocks[-1] + self._size(p) - self._size(prefixlen)
+                if found is None or value > found:
+                    found = value
+            elif found is None or blocks[0] < found:
+                found = blocks[0]
+        return found
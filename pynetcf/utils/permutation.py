@@ -0,0 +1,63 @@
+from random import Random
+
+# rounds of the Feistel network
+ROUNDS = 6
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(num):
+    "Return the 64 bits hash of the number, the finalizer of splitmix64"
+    num &= _MASK64
+    num = (num ^ num >> 30) * 0xBF58476D1CE4E5B9 & _MASK64
+    num = (num ^ num >> 27) * 0x94D049BB133111EB & _MASK64
+    return num ^ num >> 31
+
+
+class Permutation:
+    """A pseudo-random permutation of the numbers from 0 to size
+
+    The nth number is computed on demand with a balanced Feistel network over
+    the smallest even number of bits, a number out of the range is encrypted
+    again until it is in the range (cycle walking). So the permutation takes
+    constant memory for any size and the same seed gives the same order.
+    """
+
+    __slots__ = ("size", "_half", "_mask", "_keys")
+
+    def __init__(self, size, seed=None):
+        """
+        :param size (int): number of the numbers
+        :param seed: the seed of the keys of the rounds, `None` is random
+        """
+        bits = max(2, (size - 1).bit_length())
+        bits += bits & 1
+
+        self.size = size
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+        rng = Random(seed)
+        self._keys = [rng.getrandbits(64) for _ in range(ROUNDS)]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError("permutation index out of range")
+
+        num = self._encrypt(index)
+        while num >= self.size:
+            num = self._encrypt(num)
+        return num
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+    def _encrypt(self, num):
+        half, mask = self._half, self._mask
+        left, right = num >> half, num & mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix(right + key) & mask)
+        return left << half | right
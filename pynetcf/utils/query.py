@@ -0,0 +1,185 @@
+import operator
+
+# the value of an attribute that does not exist on the object
+MISSING = object()
+
+
+def _lower(func):
+    "Return the lookup function of the case-insensitive lookup"
+    return lambda value, arg: func(value.lower(), arg.lower())
+
+
+def _contains(value, arg):
+    return arg in value
+
+
+def _startswith(value, arg):
+    return value.startswith(arg)
+
+
+def _endswith(value, arg):
+    return value.endswith(arg)
+
+
+def _in(value, arg):
+    # a multi value attribute matches if any of its values is in the query
+    if isinstance(value, (list, tuple, set)):
+        return any(v in arg for v in value)
+    return value in arg
+
+
+def _range(value, arg):
+    return arg[0] <= value <= arg[1]
+
+
+# the lookup functions key by the lookup name, called with the attribute value
+# and the query value
+LOOKUPS = {
+    "exact": operator.eq,
+    "iexact": _lower(operator.eq),
+    "ne": operator.ne,
+    "in": _in,
+    "contains": _contains,
+    "icontains": _lower(_contains),
+    "startswith": _startswith,
+    "istartswith": _lower(_startswith),
+    "endswith": _endswith,
+    "iendswith": _lower(_endswith),
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "range": _range,
+    "isnull": None,
+}
+
+
+def _getter(path):
+    """Return a function that get the attribute of the path from an object,
+    the first name is an attribute and the next names are a key of a dict or
+    an attribute ex. attributes__role"""
+    name, *names = path
+
+    def get(obj):
+        value = getattr(obj, name, MISSING)
+        for name_ in names:
+            if value is MISSING:
+                break
+            if isinstance(value, dict):
+                value = value.get(name_, MISSING)
+            else:
+                value = getattr(value, name_, MISSING)
+        return value
+
+    return get
+
+
+class Condition:
+    """A single compiled lookup of a query"""
+
+    __slots__ = ("path", "lookup", "value", "_get", "_test")
+
+    def __init__(self, key, value):
+        """
+        :param key (str): the attribute path and the lookup separated by `__`
+            ex. cidr, cidr__startswith or attributes__role__in
+        :param value: the query value, a function is called with the attribute
+            value instead of an exact lookup
+        """
+        path = key.split("__")
+        lookup = "exact"
+        if len(path) > 1 and path[-1] in LOOKUPS:
+            lookup = path.pop()
+
+        if lookup == "in":
+            try:
+                value = frozenset(value)
+            except TypeError:
+                value = tuple(value)
+
+        self.path = tuple(path)
+        self.lookup = lookup
+        self.value = value
+        self._get = _getter(path)
+
+        if lookup == "isnull":
+            self._test = self._isnull
+        elif lookup == "exact" and callable(value):
+            self._test = value
+        else:
+            func = LOOKUPS[lookup]
+            self._test = lambda attr_value: func(attr_value, value)
+
+    def _isnull(self, attr_value):
+        return (attr_value is None or attr_value is MISSING) == bool(self.value)
+
+    def __repr__(self):
+        return f"<Condition: {'__'.join(self.path)}__{self.lookup}={self.value!r}>"
+
+    def is_indexable(self):
+        "Return `True` if the condition is an exact or in lookup of a value"
+        return self.lookup in ("exact", "in") and not callable(self.value)
+
+    def values(self):
+        "Return the values of an indexable condition"
+        return self.value if self.lookup == "in" else (self.value,)
+
+    def match(self, obj):
+        "Return `True` if the object matches the condition"
+        attr_value = self._get(obj)
+        if attr_value is MISSING and self.lookup != "isnull":
+            return False
+        try:
+            return bool(self._test(attr_value))
+        except (TypeError, AttributeError):
+            return False
+
+
+class Query:
+    """A query of Django style lookups compiled once into predicates
+
+    The keyword arguments are the attribute path and the lookup separated by
+    `__` ex. `cidr__startswith="10."`, `prefix_length__gte=24` or
+    `attributes__role__in=["leaf", "spine"]`. A path may follow the keys of a
+    dict attribute. The default lookup is exact and a function value is called
+    with the attribute value. An object without the attribute does not match.
+    """
+
+    def __init__(self, **kwargs):
+        self.conditions = [Condition(k, v) for k, v in kwargs.items()]
+
+    def __bool__(self):
+        return bool(self.conditions)
+
+    def __repr__(self):
+        return f"<Query: {self.conditions}>"
+
+    def indexable(self, names):
+        """
+        Return the indexable conditions of the top level attributes
+        :param names (list): the indexed attribute names
+        :return: dict of the attribute name and the values of the condition
+        """
+        return {
+            c.path[0]: c.values()
+            for c in self.conditions
+            if len(c.path) == 1 and c.path[0] in names and c.is_indexable()
+        }
+
+    def match(self, obj):
+        "Return `True` if the object matches all the conditions"
+        for condition in self.conditions:
+            if not condition.match(obj):
+                return False
+        return True
+
+    def filter(self, objects):
+        "Yield the matching objects"
+        match = self.match
+        for obj in objects:
+            if match(obj):
+                yield obj
+
+    def get(self, objects):
+        "Return the first matching object or `None`"
+        return next(self.filter(objects), None)
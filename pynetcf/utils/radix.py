@@ -0,0 +1,144 @@
+class _Node:
+    """A prefix of the tree, the node without an item is a branch node"""
+
+    __slots__ = ("value", "prefixlen", "item", "children")
+
+    def __init__(self, value, prefixlen, item=None):
+        self.value = value
+        self.prefixlen = prefixlen
+        self.item = item
+        self.children = [None, None]
+
+
+class RadixTree:
+    """A binary radix (Patricia) tree of the IP prefixes
+
+    The prefixes are keyed by the integer value of the network address and the
+    prefix length. The nodes of a single child without an item are compressed,
+    so a lookup visits at most `width` nodes ex. 32 for IPv4 and 128 for IPv6.
+    """
+
+    __slots__ = ("width", "_root", "_len")
+
+    def __init__(self, width=32):
+        """
+        :param width (int): number of bits of the IP addresses
+        """
+        self.width = width
+        self._root = _Node(0, 0)
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _bit(self, value, position):
+        "Return the bit of the value at the position from the most significant"
+        return (value >> (self.width - position - 1)) & 1
+
+    def _common(self, a, b, prefixlen):
+        "Return the length of the common prefix of the values, up to prefixlen"
+        return min(prefixlen, self.width - (a ^ b).bit_length())
+
+    def _mask(self, value, prefixlen):
+        host_bits = self.width - prefixlen
+        return value >> host_bits << host_bits
+
+    def add(self, value, prefixlen, item):
+        """
+        Add the item of the prefix, replace the item of an existing prefix
+        :param value (int): the network address
+        :param prefixlen (int): the prefix length
+        :param item: the object of the prefix ex. a network
+        """
+        value = self._mask(value, prefixlen)
+        node = self._root
+        while True:
+            if node.prefixlen == prefixlen:
+                if node.item is None:
+                    self._len += 1
+                node.item = item
+                return
+
+            bit = self._bit(value, node.prefixlen)
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _Node(value, prefixlen, item)
+                self._len += 1
+                return
+
+            common = self._common(value, child.value, min(prefixlen, child.prefixlen))
+            if common == child.prefixlen:
+                node = child
+                continue
+
+            if common == prefixlen:
+                # the new prefix contains the child
+                new = _Node(value, prefixlen, item)
+            else:
+                # a branch node at the first different bit
+                new = _Node(self._mask(value, common), common)
+                new.children[self._bit(value, common)] = _Node(value, prefixlen, item)
+            new.children[self._bit(child.value, common)] = child
+            node.children[bit] = new
+            self._len += 1
+            return
+
+    def discard(self, value, prefixlen, item=None):
+        """
+        Remove the item of the prefix if exists
+        :param value (int): the network address
+        :param prefixlen (int): the prefix length
+        :param item: remove only if this is the item of the prefix
+        """
+        value = self._mask(value, prefixlen)
+        parent, node = None, self._root
+        while node is not None and node.prefixlen < prefixlen:
+            parent, node = node, node.children[self._bit(value, node.prefixlen)]
+
+        if node is None or node.prefixlen != prefixlen or node.value != value:
+            return
+        if node.item is None or (item is not None and node.item is not item):
+            return
+
+        node.item = None
+        self._len -= 1
+        if parent is None:
+            return
+
+        # compress the nodes left without an item and with a single child
+        for branch, above in ((node, parent), (parent, None)):
+            if branch.item is not None or branch is self._root:
+                break
+            children = [c for c in branch.children if c is not None]
+            if len(children) == 2:
+                break
+            if above is None:
+                above = self._parent_of(branch)
+            index = above.children.index(branch)
+            above.children[index] = children[0] if children else None
+
+    def _parent_of(self, node):
+        "Return the parent node of the node"
+        parent = self._root
+        while True:
+            child = parent.children[self._bit(node.value, parent.prefixlen)]
+            if child is node:
+                return parent
+            parent = child
+
+    def get_parent(self, value, prefixlen):
+        """
+        Return the item of the longest prefix that contains the prefix, the
+        prefix itself is excluded
+        :param value (int): the network address
+        :param prefixlen (int): the prefix length
+        """
+        parent = None
+        node = self._root
+        while node is not None and node.prefixlen < prefixlen:
+            if self._common(value, node.value, node.prefixlen) < node.prefixlen:
+                break
+            if node.item is not None:
+                parent = node.item
+            node = node.children[self._bit(value, node.prefixlen)]
+        return parent
@@ -11,7 +11,7 @@ setup(
         """
     ),
     license="MIT",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=["pynsot", "sortedcontainers"],
     classifiers=[
         "Programming Language :: Python :: 3.5",
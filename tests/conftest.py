@@ -0,0 +1,30 @@
+import os
+
+# the tests run against the bundled in-memory fake NSoT server
+os.environ.setdefault("PYNETCF_NSOT_FAKE", "1")
+
+import pytest  # noqa: E402
+
+from pynetcf.nsot import fake  # noqa: E402
+from pynetcf.nsot.client import NSoTClient  # noqa: E402
+from pynetcf.nsot.network import Network  # noqa: E402
+from pynetcf.nsot.resource import Resource, ResourceStore  # noqa: E402
+
+
+@pytest.fixture
+def nsot():
+    "Reset the fake NSoT server and the cache objects of the resource models"
+    fake.server.reset(["site1"])
+    NSoTClient._resource_cache.clear()
+    NSoTClient._change_id = None
+    for model in Resource._models.values():
+        model.manager._cache = ResourceStore(model.manager)
+        model.manager._loaded = False
+    Network.manager._parents = None
+    Network.manager._hosts_generators_cache = None
+    return fake.server
+
+
+def create(server, name, site_id=1, **payload):
+    "Create an object in the fake NSoT server like another client"
+    return server.request("POST", ("sites", site_id, name), data=payload)
@@ -0,0 +1,99 @@
+from random import Random
+
+from pynetcf.utils.buddy import BuddyAllocator
+
+WIDTH = 12
+# the network 0x800/2 of 1024 addresses
+VALUE, PREFIXLEN = 0x800, 2
+
+
+def size(prefixlen):
+    return 1 << (WIDTH - prefixlen)
+
+
+class Model:
+    "The allocated addresses of the network, a byte per address"
+
+    def __init__(self):
+        self.used = bytearray(size(PREFIXLEN))
+
+    def set(self, value, prefixlen, used):
+        start = value - VALUE
+        self.used[start : start + size(prefixlen)] = bytes([used]) * size(prefixlen)
+
+    def is_free(self, value, prefixlen):
+        start = value - VALUE
+        return not any(self.used[start : start + size(prefixlen)])
+
+    def first(self, prefixlen, reverse=False):
+        values = range(VALUE, VALUE + size(PREFIXLEN), size(prefixlen))
+        for value in reversed(values) if reverse else values:
+            if self.is_free(value, prefixlen):
+                return value
+        return None
+
+
+def assert_same(allocator, model):
+    for prefixlen in range(PREFIXLEN, WIDTH + 1):
+        assert allocator.first(prefixlen) == model.first(prefixlen), prefixlen
+        assert allocator.first(prefixlen, True) == model.first(prefixlen, True)
+
+
+def test_allocate_and_free_match_the_allocated_addresses():
+    rng = Random(1)
+    allocator = BuddyAllocator(VALUE, PREFIXLEN, WIDTH)
+    model = Model()
+    allocated = []
+
+    for _ in range(400):
+        prefixlen = rng.randint(PREFIXLEN + 1, WIDTH)
+        action = rng.random()
+        if action < 0.5:
+            # the next free subnet, never overlaps the allocated subnets
+            value = allocator.first(prefixlen, reverse=rng.random() < 0.5)
+            if value is None:
+                continue
+            assert model.is_free(value, prefixlen)
+        else:
+            # any subnet ex. a subnet added by sync that contains allocated subnets
+            value = VALUE + rng.randrange(size(PREFIXLEN) // size(prefixlen)) * size(
+                prefixlen
+            )
+
+        if action < 0.8:
+            allocator.allocate(value, prefixlen)
+            model.set(value, prefixlen, 1)
+            allocated.append((value, prefixlen))
+        else:
+            allocator.free(value, prefixlen)
+            model.set(value, prefixlen, 0)
+
+        value = VALUE + rng.randrange(size(PREFIXLEN) // size(prefixlen)) * size(
+            prefixlen
+        )
+        assert allocator.is_free(value, prefixlen) == model.is_free(value, prefixlen)
+        assert_same(allocator, model)
+
+    # no block is leaked once all the subnets are freed
+    for value, prefixlen in allocated:
+        allocator.free(value, prefixlen)
+    assert allocator.first(PREFIXLEN) == VALUE
+    assert allocator.is_free(VALUE, PREFIXLEN)
+
+
+def test_allocating_all_subnets_leaves_no_free_subnet():
+    allocator = BuddyAllocator(VALUE, PREFIXLEN, WIDTH)
+    subnets = []
+    while True:
+        value = allocator.first(8)
+        if value is None:
+            break
+        allocator.allocate(value, 8)
+        subnets.append(value)
+
+    assert subnets == list(range(VALUE, VALUE + size(PREFIXLEN), size(8)))
+    assert allocator.first(WIDTH) is None
+
+    for value in subnets:
+        allocator.free(value, 8)
+    assert allocator.first(PREFIXLEN) == VALUE
@@ -0,0 +1,50 @@
+import asyncio
+from threading import Barrier, Thread
+
+from pynetcf.nsot.aio import AsyncNSoTClient
+from pynetcf.nsot.metrics import Metrics, metrics
+from pynetcf.nsot.network import Network
+from pynetcf.nsot.planner import commit
+
+
+def test_phase_is_per_thread():
+    metrics = Metrics()
+    barrier = Barrier(2)
+
+    def run(phase):
+        with metrics.phase(phase):
+            # both threads are in their phase before recording
+            barrier.wait()
+            metrics.record("networks", "GET", 1, "ok", 0.01)
+            barrier.wait()
+
+    threads = [Thread(target=run, args=(p,)) for p in ("loading", "commit")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(m["phase"] for m in metrics.get()) == ["commit", "loading"]
+    assert metrics.current_phase is None
+
+
+def commit_phases(run_commit):
+    "Return the phases of the POST requests of the commit"
+    metrics.reset()
+    for num in range(3):
+        Network(f"10.0.{num}.0/24", 1)
+    run_commit()
+    return {m["phase"] for m in metrics.get() if m["method"] == "POST"}
+
+
+def test_planner_commit_records_requests_in_commit_phase(nsot):
+    assert commit_phases(lambda: commit(max_workers=2)) == {"commit"}
+
+
+def test_async_commit_records_requests_in_commit_phase(nsot):
+    client = AsyncNSoTClient()
+    try:
+        phases = commit_phases(lambda: asyncio.run(client.commit()))
+    finally:
+        client.close()
+    assert phases == {"commit"}
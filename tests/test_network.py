@@ -0,0 +1,95 @@
+import pytest
+
+from pynetcf.nsot.client import get_results
+from pynetcf.nsot.network import Network
+from pynetcf.nsot.sync import sync
+
+from conftest import create
+
+
+def test_hosts_generator_skips_hosts_added_by_sync(nsot):
+    nsot.load({"networks": [{"site_id": 1, "cidr": "10.0.0.0/24"}]})
+    network = Network("10.0.0.0/24", 1)
+    hosts = network.hosts_generator()
+    assert str(next(hosts)) == "10.0.0.1/32"
+
+    for num in (2, 3, 4):
+        create(nsot, "networks", cidr=f"10.0.0.{num}/32")
+    assert sync() == 3
+
+    host = next(hosts)
+    assert str(host) == "10.0.0.5/32"
+    assert not host.exists()
+    assert network.free_hosts_count() == 249
+
+
+def test_subnets_generator_skips_subnets_added_by_sync(nsot):
+    nsot.load({"networks": [{"site_id": 1, "cidr": "10.0.0.0/16"}]})
+    network = Network("10.0.0.0/16", 1)
+    subnets = network.subnets_generator(24)
+    assert str(next(subnets)) == "10.0.0.0/24"
+
+    create(nsot, "networks", cidr="10.0.1.0/24")
+    create(nsot, "networks", cidr="10.0.2.0/24")
+    assert sync() == 2
+
+    subnet = next(network.subnets_generator(24))
+    assert str(subnet) == "10.0.3.0/24"
+    assert not subnet.exists()
+    assert str(next(subnets)) == "10.0.4.0/24"
+
+
+def load_networks(server, *cidrs):
+    server.load({"networks": [{"site_id": 1, "cidr": cidr} for cidr in cidrs]})
+
+
+@pytest.mark.parametrize("hydrated", [True, False])
+def test_network_created_by_sync_adopts_the_subnets_within(nsot, hydrated):
+    load_networks(nsot, "10.0.0.0/16", "10.0.0.0/24", "10.0.0.5/32")
+    top = Network("10.0.0.0/16", 1)
+    if hydrated:
+        assert [str(s) for s in top.subnets()] == ["10.0.0.0/24"]
+        assert str(next(top.subnets_generator(20))) == "10.0.16.0/20"
+
+    create(nsot, "networks", cidr="10.0.0.0/20")
+    assert sync() == 1
+
+    mid = Network("10.0.0.0/20", 1)
+    assert [str(s) for s in mid.subnets()] == ["10.0.0.0/24"]
+    assert [str(s) for s in top.subnets() if s.exists()] == ["10.0.0.0/20"]
+    assert str(next(mid.subnets_generator(24))) == "10.0.1.0/24"
+    assert str(next(top.subnets_generator(20))) != "10.0.0.0/20"
+
+
+@pytest.mark.parametrize("hydrated", [True, False])
+def test_network_deleted_by_sync_moves_its_subnets_to_the_parent(nsot, hydrated):
+    load_networks(nsot, "10.0.0.0/16", "10.0.0.0/20", "10.0.0.0/24", "10.0.0.5/32")
+    top = Network("10.0.0.0/16", 1)
+    if hydrated:
+        assert [str(s) for s in top.subnets(all=True)] == ["10.0.0.0/24", "10.0.0.0/20"]
+        assert str(next(top.subnets_generator(20))) == "10.0.16.0/20"
+
+    path = "sites", 1, "networks"
+    mid = get_results(nsot.request("GET", path, params={"cidr": "10.0.0.0/20"}))[0]
+    nsot.request("DELETE", (*path, mid["id"]), params={"force_delete": True})
+    assert sync() == 1
+
+    assert [str(s) for s in top.subnets() if s.exists()] == ["10.0.0.0/24"]
+    assert str(next(top.subnets_generator(24))) != "10.0.0.0/24"
+    host = Network("10.0.0.5/32", 1)
+    assert str(host.parent) == "10.0.0.0/24"
+
+
+def test_new_network_creates_only_its_raw_supernets(nsot):
+    load_networks(nsot, "10.0.0.0/16", "10.0.0.0/24", "10.0.1.0/24", "10.1.0.0/16")
+    Network.manager.load()
+    store = Network.manager._objects
+
+    host = next(Network("10.0.0.0/24", 1).hosts_generator())
+    assert str(host.parent) == "10.0.0.0/24"
+    assert store.is_raw(("10.0.1.0/24", 1))
+    assert store.is_raw(("10.1.0.0/16", 1))
+
+    subnet = Network("10.0.1.0/30", 1)
+    assert str(subnet.parent) == "10.0.1.0/24"
+    assert store.is_raw(("10.1.0.0/16", 1))
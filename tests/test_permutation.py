@@ -0,0 +1,32 @@
+import pytest
+
+from pynetcf.utils.permutation import Permutation
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 5, 7, 16, 100, 1000, 4099])
+@pytest.mark.parametrize("seed", [0, 1, "site"])
+def test_permutation_is_a_bijection(size, seed):
+    permutation = Permutation(size, seed)
+    numbers = list(permutation)
+    assert len(numbers) == len(permutation) == size
+    assert sorted(numbers) == list(range(size))
+    assert [permutation[i] for i in range(size)] == numbers
+
+
+def test_same_seed_gives_the_same_order():
+    assert list(Permutation(1000, 1)) == list(Permutation(1000, 1))
+    assert list(Permutation(1000, 1)) != list(Permutation(1000, 2))
+    assert list(Permutation(1000, 1)) != list(range(1000))
+
+
+def test_large_permutation_has_no_collision():
+    permutation = Permutation(2**64, 1)
+    numbers = {permutation[i] for i in range(10000)}
+    assert len(numbers) == 10000
+    assert all(0 <= num < 2**64 for num in numbers)
+
+
+@pytest.mark.parametrize("index", [-1, 10])
+def test_index_out_of_range(index):
+    with pytest.raises(IndexError):
+        Permutation(10, 1)[index]
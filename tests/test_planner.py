@@ -0,0 +1,60 @@
+import pytest
+
+import pynetcf.constants as C
+from pynetcf.nsot.interface import Device, Interface
+from pynetcf.nsot.network import Network
+from pynetcf.nsot.planner import CommitPlanner, commit
+
+COUNT = 5
+
+
+@pytest.fixture
+def inventory(nsot, monkeypatch):
+    "New devices, interfaces and their addresses in a new network"
+    monkeypatch.setattr(C, "NSOT_BULK_CHUNK_SIZE", 2)
+    nsot.load({"networks": [{"site_id": 1, "cidr": "10.0.0.0/8"}]})
+
+    network = Network("10.1.0.0/24", 1)
+    interfaces = []
+    for num in range(1, COUNT + 1):
+        iface = Interface(f"leaf{num}", "swp1", 1)
+        iface.add_addresses(f"10.1.0.{num}/32")
+        interfaces.append(iface)
+
+    devices = [iface.device for iface in interfaces]
+    hosts = [host for iface in interfaces for host in iface._addresses.values()]
+    return {"devices": devices, "networks": [network, *hosts], "interfaces": interfaces}
+
+
+def test_plan_orders_waves_by_dependencies(inventory):
+    waves = CommitPlanner().plan()
+
+    network = inventory["networks"][0]
+    assert [set(w) for w in waves] == [
+        {*inventory["devices"], network},
+        set(inventory["networks"][1:]),
+        set(inventory["interfaces"]),
+    ]
+
+
+def test_commit_posts_the_waves_in_chunks(nsot, inventory):
+    chunks = -(-COUNT // C.NSOT_BULK_CHUNK_SIZE)
+
+    # the network reserved by its hosts is PATCH in a fourth wave
+    assert commit(max_workers=2) == 4
+    assert nsot.requests["POST", "devices"] == chunks
+    # the network, then the hosts of the network
+    assert nsot.requests["POST", "networks"] == 1 + chunks
+    assert nsot.requests["POST", "interfaces"] == chunks
+    assert nsot.requests["PATCH", "networks"] == 1
+
+
+def test_commit_sets_the_ids_and_cleans_the_objects(nsot, inventory):
+    commit()
+
+    assert CommitPlanner().pending() == []
+    for name, objects in inventory.items():
+        for obj in objects:
+            assert not obj.has_changes()
+            nsot_obj = nsot.request("GET", ("sites", 1, name, obj.id))
+            assert nsot_obj == obj.get()
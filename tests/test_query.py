@@ -0,0 +1,78 @@
+import pytest
+
+from pynetcf.nsot.network import Network
+from pynetcf.utils.query import Query
+
+ROLES = ("leaf", "spine", "border")
+
+LOOKUPS = [
+    {"id": 3},
+    {"id__in": [1, 4, 99]},
+    {"cidr": "10.0.1.0/24"},
+    {"cidr__in": ["10.0.1.0/24", "10.0.2.0/24", "10.9.0.0/24"]},
+    {"cidr": "10.0.1.0/24", "site_id": 1},
+    {"site_id": 1, "prefix_length__gte": 24},
+    {"attributes__role": "leaf"},
+    {"attributes__role__in": ["spine", "border"]},
+    {"attributes__role__startswith": "sp"},
+    {"attributes__role": "border", "cidr__startswith": "10.0.1"},
+    {"attributes__role": "missing"},
+    {"attributes__tags": "a"},
+    {"attributes__tags__in": ["b"]},
+    {"id__in": [2, 3], "attributes__role": "spine"},
+]
+
+
+@pytest.fixture
+def networks(nsot):
+    nsot.load(
+        {
+            "attributes": [
+                {"site_id": 1, "resource_name": "Network", "name": "role"},
+                {
+                    "site_id": 1,
+                    "resource_name": "Network",
+                    "name": "tags",
+                    "multi": True,
+                },
+            ],
+            "networks": [
+                {
+                    "site_id": 1,
+                    "cidr": f"10.0.{num}.0/24",
+                    "attributes": {
+                        "role": ROLES[num % 3],
+                        "tags": ["a", "b"] if num % 2 else ["a"],
+                    },
+                }
+                for num in range(12)
+            ],
+        }
+    )
+    Network.manager.load()
+
+
+def assert_indexed_equals_linear(lookups):
+    # the indexed lookups are run first so they see the raw records
+    indexed = [
+        (set(Network.manager.filter(**kw)), Network.manager.get(**kw)) for kw in lookups
+    ]
+    objects = Network.manager.get()
+    for kw, (filtered, first) in zip(lookups, indexed):
+        linear = set(Query(**kw).filter(objects))
+        assert filtered == linear, kw
+        assert (first in linear) if linear else first is None, kw
+
+
+def test_indexed_lookups_equal_linear_scan(networks):
+    assert_indexed_equals_linear(LOOKUPS)
+
+
+def test_indexed_lookups_follow_attribute_changes(networks):
+    assert_indexed_equals_linear(LOOKUPS)
+
+    network = Network("10.0.1.0/24", 1)
+    network.add_attributes(role="spine")
+    Network("10.0.2.0/24", 1).remove_attributes("role", "tags")
+    assert network in Network.manager.filter(attributes__role="spine")
+    assert_indexed_equals_linear(LOOKUPS)
@@ -0,0 +1,78 @@
+from random import Random
+
+import pytest
+
+from pynetcf.utils.radix import RadixTree
+
+
+def mask(value, prefixlen, width):
+    host_bits = width - prefixlen
+    return value >> host_bits << host_bits
+
+
+def longest_prefix(prefixes, value, prefixlen, width):
+    "Return the item of the longest stored prefix that contains the prefix"
+    found = None
+    for (v, p), item in prefixes.items():
+        if p < prefixlen and mask(value, p, width) == v:
+            if found is None or p > found[0]:
+                found = p, item
+    return found and found[1]
+
+
+def random_prefixes(rng, width, count):
+    prefixes = {}
+    for _ in range(count):
+        prefixlen = rng.randint(0, width)
+        value = mask(rng.getrandbits(width), prefixlen, width)
+        prefixes[value, prefixlen] = f"{value}/{prefixlen}"
+    return prefixes
+
+
+def assert_lookups(tree, prefixes, rng, width):
+    assert len(tree) == len(prefixes)
+    queries = list(prefixes) + [
+        (rng.getrandbits(width), rng.randint(0, width)) for _ in range(500)
+    ]
+    for value, prefixlen in queries:
+        value = mask(value, prefixlen, width)
+        expected = longest_prefix(prefixes, value, prefixlen, width)
+        assert tree.get_parent(value, prefixlen) == expected, (value, prefixlen)
+
+
+@pytest.mark.parametrize("width", [8, 32, 128])
+def test_longest_prefix_match_after_insert_and_delete(width):
+    rng = Random(width)
+    prefixes = random_prefixes(rng, width, 300)
+
+    tree = RadixTree(width)
+    for (value, prefixlen), item in prefixes.items():
+        tree.add(value, prefixlen, item)
+    assert_lookups(tree, prefixes, rng, width)
+
+    for key in rng.sample(sorted(prefixes), len(prefixes) // 2):
+        tree.discard(*key)
+        del prefixes[key]
+    assert_lookups(tree, prefixes, rng, width)
+
+    for key, item in random_prefixes(rng, width, 100).items():
+        tree.add(*key, item)
+        prefixes[key] = item
+    assert_lookups(tree, prefixes, rng, width)
+
+
+def test_add_replaces_and_discard_checks_the_item():
+    tree = RadixTree()
+    tree.add(10 << 24, 8, "a")
+    tree.add(10 << 24, 8, "b")
+    assert len(tree) == 1
+    assert tree.get_parent(10 << 24, 16) == "b"
+
+    tree.discard(10 << 24, 8, "a")
+    assert tree.get_parent(10 << 24, 16) == "b"
+    tree.discard(10 << 24, 16)
+    assert len(tree) == 1
+
+    tree.discard(10 << 24, 8, "b")
+    assert len(tree) == 0
+    assert tree.get_parent(10 << 24, 16) is None
@@ -0,0 +1,13 @@
+from pynetcf.nsot.client import NSoTClient
+from pynetcf.nsot.network import Network
+
+
+def test_load_releases_the_nsot_objects_to_the_store(nsot):
+    nsot.load({"networks": [{"site_id": 1, "cidr": "10.0.0.0/24"}]})
+    NSoTClient.get_resource("networks")
+
+    Network.manager.load()
+
+    assert "networks" not in NSoTClient._resource_cache
+    assert Network.manager._objects.is_raw(("10.0.0.0/24", 1))
+    assert Network("10.0.0.0/24", 1).exists()
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from slumber.exceptions import HttpServerError
+
+import pynetcf.constants as C
+from pynetcf.nsot.client import NSoTClient, nsot_request
+from pynetcf.nsot.retry import CircuitOpenError, circuit_breaker, stats
+
+
+@pytest.fixture
+def clock(nsot, monkeypatch):
+    "Reset the circuit breaker and the counters, the sleeps advance the clock"
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(time, "sleep", sleep)
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    circuit_breaker.record_success()
+    stats.clear()
+    yield sleeps
+    circuit_breaker.record_success()
+
+
+def networks():
+    return NSoTClient.resource.sites(1).networks
+
+
+def test_get_server_error_is_retried(nsot, clock):
+    nsot.inject_error(502, "GET", "networks")
+
+    assert nsot_request(networks().get)() == []
+    assert nsot.requests["GET", "networks"] == 2
+    assert stats["retries"] == 1
+    assert len(clock) == 1
+
+
+def test_post_server_error_is_not_retried(nsot, clock):
+    nsot.inject_error(502, "POST", "networks")
+
+    with pytest.raises(HttpServerError):
+        nsot_request(networks().post)({"cidr": "10.0.0.0/24"})
+    assert nsot.requests["POST", "networks"] == 1
+    assert stats["failures"] == 1
+    assert clock == []
+
+
+def test_rejected_request_waits_retry_after(nsot, clock):
+    nsot.inject_error(429, "POST", "networks", headers={"Retry-After": "7"})
+
+    created = nsot_request(networks().post)({"cidr": "10.0.0.0/24"})
+    assert created["cidr"] == "10.0.0.0/24"
+    assert nsot.requests["POST", "networks"] == 2
+    assert clock == [7]
+
+
+def test_circuit_opens_after_threshold_and_half_opens_after_timeout(
+    nsot, clock, monkeypatch
+):
+    monkeypatch.setattr(C, "NSOT_RETRIES", 0)
+    nsot.inject_error(502, "GET", "networks", count=C.NSOT_CIRCUIT_THRESHOLD)
+    get = nsot_request(networks().get)
+
+    for _ in range(C.NSOT_CIRCUIT_THRESHOLD):
+        with pytest.raises(HttpServerError):
+            get()
+    assert circuit_breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        get()
+    assert nsot.requests["GET", "networks"] == C.NSOT_CIRCUIT_THRESHOLD
+    assert stats["failures"] == C.NSOT_CIRCUIT_THRESHOLD + 1
+
+    time.sleep(C.NSOT_CIRCUIT_RESET_TIMEOUT)
+    assert circuit_breaker.state == "half-open"
+    assert get() == []
+    assert circuit_breaker.state == "closed"
@@ -0,0 +1,56 @@
+import hashlib
+import json
+
+import pynetcf.constants as C
+from pynetcf.nsot.client import NSoTClient
+from pynetcf.nsot.snapshot import Snapshot
+
+
+class PagesEndpoint:
+    "An endpoint that returns the pages in order, every page has a next URL"
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.requests = 0
+
+    def get(self, limit=None, offset=None):
+        self.requests += 1
+        results = self.pages.pop(0) if self.pages else []
+        return {"results": results, "next": "http://nsot/next"}
+
+
+def networks(site_id, ids):
+    return [{"id": i, "site_id": site_id, "cidr": f"10.0.{i}.0/24"} for i in ids]
+
+
+def test_iter_pages_stops_on_empty_page_with_next():
+    endpoint = PagesEndpoint([networks(1, [1, 2]), networks(1, [3])])
+
+    pages = list(NSoTClient.iter_pages(endpoint, page_size=2))
+
+    assert [len(p) for p in pages] == [2, 1]
+    assert endpoint.requests == 3
+
+
+def test_save_streams_objects_and_rewrites_changed_sites(tmp_path, monkeypatch):
+    monkeypatch.setattr(C, "DATABASE_DIR", str(tmp_path))
+    snapshot = Snapshot()
+
+    assert snapshot.save("networks", iter(networks(1, [2, 1]) + networks(2, [3])))
+
+    # staged page by page, site 1 is unchanged
+    snapshot.begin("networks")
+    snapshot.stage("networks", networks(1, [1]))
+    snapshot.stage("networks", networks(1, [2]) + networks(2, [4]))
+    assert snapshot.save("networks") == [2]
+    assert snapshot.generation("networks", 1) == 1
+    assert snapshot.generation("networks", 2) == 2
+    assert [o["id"] for o in snapshot.iter_objects("networks")] == [1, 2, 4]
+
+    # the digest is the one of the JSON list of the objects sorted by ID
+    with snapshot._connect() as conn:
+        (digest,) = conn.execute(
+            "SELECT digest FROM generations WHERE site_id=1"
+        ).fetchone()
+    data = json.dumps(networks(1, [1, 2]), sort_keys=True).encode()
+    assert digest == hashlib.sha1(data).hexdigest()